@@ -1,16 +1,155 @@
 import json
+import os
+import numpy as np
+import instrumentation
 from emotion import EmotionAnalyzer
 from topic import TopicAnalyzer
+from results import EMOTION_ACTIVATION, EMOTION_LABELS, AdorescoreResult, EmotionResult, EmotionScore, TopicResult
+
+# "top2" scores the primary & secondary emotion, "distribution" the full probability vector
+ADORESCORE_MODES = ("top2", "distribution")
+ADORESCORE_MODE_ENV = "CUSTOMERVOICE_ADORESCORE_MODE"
+
+
+def _round4(values):
+    """Python's round(x, 4) per element, vectorized.
+
+    rint(x * 1e4) / 1e4 lands on the same double except where x * 1e4 is within float error
+    of a .5 tie; those few elements go through round() itself so parity stays exact.
+    """
+    values = np.asarray(values, dtype=float)
+    scaled = values * 1e4
+    rounded = np.rint(scaled) / 1e4
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) <= np.abs(scaled) * 1e-12 + 1e-12
+    for i in np.flatnonzero(near_tie):
+        rounded[i] = round(float(values[i]), 4)
+    return rounded
+
+
+class ScoreColumns:
+    """A batch of emotion & topic results as NumPy columns for vectorized scoring.
+
+    Emotions are per-row label/activation/intensity arrays ("" label when missing) and topics a
+    (rows x topics) boolean mask. Each row also points at its ordered topic list, which keeps the
+    weight sums in the same order as the scalar path; built from a bare mask, that order is the
+    column order. Emotion columns are optional so topic-only work (reweighting) can skip them.
+    """
+    __slots__ = (
+        "topics", "topic_mask", "topic_sets", "topic_set_ids",
+        "primary_emotion", "primary_activation", "primary_intensity",
+        "secondary_emotion", "secondary_activation", "secondary_intensity", "probabilities"
+    )
+
+    def __init__(self, topics, topic_mask, topic_sets=None, topic_set_ids=None,
+                 primary_emotion=None, primary_activation=None, primary_intensity=None,
+                 secondary_emotion=None, secondary_activation=None, secondary_intensity=None,
+                 probabilities=None):
+        self.topics = list(topics)
+        self.topic_mask = np.asarray(topic_mask, dtype=bool)
+
+        if topic_sets is None and not self.topics:
+            topic_sets, topic_set_ids = [()], np.zeros(len(self.topic_mask), dtype=np.intp)
+        elif topic_sets is None:
+            # Pack each mask row into bytes so distinct topic sets are found with a 1-D unique
+            packed = np.packbits(self.topic_mask, axis=1)
+            codes = np.ascontiguousarray(packed).view(np.dtype((np.void, packed.shape[1]))).reshape(-1)
+            _, first, topic_set_ids = np.unique(codes, return_index=True, return_inverse=True)
+            topic_sets = [
+                tuple(topic for topic, present in zip(self.topics, self.topic_mask[row]) if present)
+                for row in first.tolist()
+            ]
+        self.topic_sets = topic_sets
+        self.topic_set_ids = np.asarray(topic_set_ids, dtype=np.intp).reshape(-1)
+
+        self.primary_emotion = None if primary_emotion is None else np.asarray(primary_emotion, dtype=object)
+        self.primary_activation = None if primary_activation is None else np.asarray(primary_activation, dtype=object)
+        self.primary_intensity = None if primary_intensity is None else np.asarray(primary_intensity, dtype=float)
+        self.secondary_emotion = None if secondary_emotion is None else np.asarray(secondary_emotion, dtype=object)
+        self.secondary_activation = None if secondary_activation is None else np.asarray(secondary_activation, dtype=object)
+        self.secondary_intensity = None if secondary_intensity is None else np.asarray(secondary_intensity, dtype=float)
+        # (rows x EMOTION_LABELS) float32, NaN rows where a result has no probability vector
+        self.probabilities = None if probabilities is None else np.asarray(probabilities, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.topic_mask)
+
+    @classmethod
+    def from_topic_lists(cls, main, **emotion_columns):
+        """Columns from per-row main-topic lists, keeping each row's exact topic order."""
+        main = list(main)
+        topics = list(dict.fromkeys(topic for row_topics in main for topic in row_topics))
+        topic_index = {topic: j for j, topic in enumerate(topics)}
+        topic_mask = np.zeros((len(main), len(topics)), dtype=bool)
+        set_index = {}
+        topic_set_ids = np.empty(len(main), dtype=np.intp)
+        for i, row_topics in enumerate(main):
+            for topic in row_topics:
+                topic_mask[i, topic_index[topic]] = True
+            topic_set_ids[i] = set_index.setdefault(tuple(row_topics), len(set_index))
+        return cls(topics, topic_mask, list(set_index), topic_set_ids, **emotion_columns)
+
+    @classmethod
+    def from_results(cls, emotion_results, topic_results):
+        emotion_results = list(emotion_results)
+        primary = [result.primary for result in emotion_results]
+        secondary = [result.secondary for result in emotion_results]
+
+        probabilities = None
+        if any(result.probabilities is not None for result in emotion_results):
+            probabilities = np.full((len(emotion_results), len(EMOTION_LABELS)), np.nan, dtype=np.float32)
+            for i, result in enumerate(emotion_results):
+                if result.probabilities is not None:
+                    probabilities[i] = result.probabilities
+
+        return cls.from_topic_lists(
+            [result.main for result in topic_results],
+            primary_emotion=[score.emotion if score else "" for score in primary],
+            primary_activation=[score.activation if score else "" for score in primary],
+            primary_intensity=[score.intensity if score else 0.0 for score in primary],
+            secondary_emotion=[score.emotion if score else "" for score in secondary],
+            secondary_activation=[score.activation if score else "" for score in secondary],
+            secondary_intensity=[score.intensity if score else 0.0 for score in secondary],
+            probabilities=probabilities
+        )
+
+    def breakdown_dicts(self, breakdown):
+        """Per-row {topic: share} dicts from a breakdown matrix, keys in each row's topic order."""
+        topic_index = {topic: j for j, topic in enumerate(self.topics)}
+        set_columns = [[(topic, topic_index[topic]) for topic in topics] for topics in self.topic_sets]
+        return [
+            {topic: row[j] for topic, j in set_columns[set_id]}
+            for set_id, row in zip(self.topic_set_ids.tolist(), breakdown.tolist())
+        ]
+
 
 class AdorescoreCalculator:
-    def __init__(self):
-        self.emotion_analyzer = EmotionAnalyzer()
-        self.topic_analyzer = TopicAnalyzer()
+    # Activation level multipliers for emotion impact
+    ACTIVATION_WEIGHTS = {"Low": 0.7, "Medium": 1.0, "High": 1.3}
+    # Base weight for topics missing from topic_weights (e.g. ones found by topic_discovery.py)
+    DEFAULT_TOPIC_WEIGHT = 0.10
+
+    def __init__(self, emotion_analyzer=None, topic_analyzer=None, mode=None, default_topic_weight=None):
+        # Reuse the caller's analyzers when given so models aren't loaded twice
+        self.emotion_analyzer = emotion_analyzer or EmotionAnalyzer()
+        self.topic_analyzer = topic_analyzer or TopicAnalyzer()
 
         # Define emotion polarity (positive or negative impact)
         self.positive_emotions = {"joy", "admiration", "love", "approval", "gratitude", "optimism", "relief", "caring"}
         self.negative_emotions = {"disappointment", "anger", "sadness", "fear", "remorse", "disgust", "annoyance", "grief", "nervousness"}
 
+        # Scoring mode, see ADORESCORE_MODES (defaults to CUSTOMERVOICE_ADORESCORE_MODE, else "top2")
+        self.mode = mode or os.environ.get(ADORESCORE_MODE_ENV, "top2")
+        if self.mode not in ADORESCORE_MODES:
+            raise ValueError(f"Unknown Adorescore mode {self.mode!r}, expected one of {ADORESCORE_MODES}")
+
+        # Impact of each label at probability 1, in EMOTION_LABELS order: 100 * polarity (+1/-1/0) * activation weight
+        polarity = np.array([
+            1.0 if label in self.positive_emotions else -1.0 if label in self.negative_emotions else 0.0
+            for label in EMOTION_LABELS
+        ])
+        activation = np.array([self.ACTIVATION_WEIGHTS.get(EMOTION_ACTIVATION[label], 1.0) for label in EMOTION_LABELS])
+        self.distribution_weights = 100 * polarity * activation
+
         # Topic base weights (normalized later)
         self.topic_weights = {
             "Delivery": 0.15,
@@ -23,29 +162,31 @@ class AdorescoreCalculator:
             "Packaging": 0.05,
             "Returns": 0.05
         }
+        self.default_topic_weight = self.DEFAULT_TOPIC_WEIGHT if default_topic_weight is None else default_topic_weight
 
     def analyze_feedback(self, feedback_text):
         """Handles emotion and topic analysis with error handling."""
         try:
             emotion_result = self.emotion_analyzer.analyze_feedback(feedback_text)
             topic_result = self.topic_analyzer.analyze_feedback(feedback_text)
-
-            # Convert JSON string responses to dictionaries if needed
-            if isinstance(emotion_result, str):
-                emotion_result = json.loads(emotion_result)
-            if isinstance(topic_result, str):
-                topic_result = json.loads(topic_result)
-
             return emotion_result, topic_result
 
-        except (json.JSONDecodeError, AttributeError, TypeError) as e:
+        except (AttributeError, TypeError, ValueError) as e:
             print(f"Error processing feedback analysis: {e}")
             return None, None
 
+    @staticmethod
+    def _as_result(result, result_cls):
+        """Accepts a result object, its dict form, or its JSON form."""
+        if isinstance(result, (str, bytes)):
+            return result_cls.from_json(result)
+        if isinstance(result, dict):
+            return result_cls.from_dict(result)
+        return result
+
     def compute_emotion_impact(self, emotion_name, intensity, activation, weight_factor):
         """Calculates weighted emotion impact based on activation level."""
-        activation_weights = {"Low": 0.7, "Medium": 1.0, "High": 1.3}
-        activation_factor = activation_weights.get(activation, 1.0)
+        activation_factor = self.ACTIVATION_WEIGHTS.get(activation, 1.0)
         
         impact = 100 * intensity * weight_factor * activation_factor
         return impact if emotion_name in self.positive_emotions else -impact
@@ -59,40 +200,80 @@ class AdorescoreCalculator:
         if not emotion_result or not topic_result:
             return {"error": "Failed to analyze emotions or topics."}
 
-        # Extract emotion data
-        emotion_data = emotion_result.get("emotion_analysis", {}).get("emotions", {})
-        primary_emotion = emotion_data.get("primary", {})
-        secondary_emotion = emotion_data.get("secondary", {})
+        return self.score_results(emotion_result, topic_result)
 
-        # Extract topic data
-        main_topics = topic_result.get("topics", {}).get("main", [])
-        subtopics = topic_result.get("topics", {}).get("subtopics", {})
+    def calculate_adorescore_from_results(self, emotion_result, topic_result):
+        """Computes the Adorescore from precomputed emotion & topic results (objects, dicts or JSON)."""
+        try:
+            emotion_result = self._as_result(emotion_result, EmotionResult)
+            topic_result = self._as_result(topic_result, TopicResult)
+        except json.JSONDecodeError as e:
+            print(f"Error processing feedback analysis: {e}")
+            return {"error": "Failed to analyze emotions or topics."}
 
-        # Compute Adorescore
+        if not emotion_result or not topic_result:
+            return {"error": "Failed to analyze emotions or topics."}
+
+        return self.score_results(emotion_result, topic_result)
+
+    def analyze_batch(self, texts, batch_size=32):
+        """Computes Adorescores for many texts using the batched emotion & topic paths."""
+        texts = list(texts)
+        emotion_results = self.emotion_analyzer.analyze_batch(texts, batch_size=batch_size)
+        topic_results = self.topic_analyzer.analyze_batch(texts, batch_size=batch_size)
+
+        return [
+            self.calculate_adorescore_from_results(emotion_result, topic_result)
+            for emotion_result, topic_result in zip(emotion_results, topic_results)
+        ]
+
+    def top2_score(self, primary_emotion, secondary_emotion):
+        """Unclamped Adorescore from the primary (full weight) and secondary (half weight) emotion."""
         adorescore = 0
-        emotion_contributions = {}
 
         # Process primary emotion
         if primary_emotion:
-            impact = self.compute_emotion_impact(
-                primary_emotion.get("emotion", ""),
-                primary_emotion.get("intensity", 0),
-                primary_emotion.get("activation", ""),
+            adorescore += self.compute_emotion_impact(
+                primary_emotion.emotion,
+                primary_emotion.intensity,
+                primary_emotion.activation,
                 weight_factor=1.0
             )
-            adorescore += impact
-            emotion_contributions[primary_emotion.get("emotion", "")] = round(impact, 4)
 
         # Process secondary emotion
         if secondary_emotion:
-            impact = self.compute_emotion_impact(
-                secondary_emotion.get("emotion", ""),
-                secondary_emotion.get("intensity", 0),
-                secondary_emotion.get("activation", ""),
+            adorescore += self.compute_emotion_impact(
+                secondary_emotion.emotion,
+                secondary_emotion.intensity,
+                secondary_emotion.activation,
                 weight_factor=0.5
             )
-            adorescore += impact
-            emotion_contributions[secondary_emotion.get("emotion", "")] = round(impact, 4)
+
+        return adorescore
+
+    def distribution_score(self, probabilities):
+        """Unclamped Adorescore from the full distribution: probability-weighted mean impact of all labels."""
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+        total = probabilities.sum()
+        return float((probabilities * self.distribution_weights).sum() / total) if total else 0.0
+
+    @instrumentation.timed("adorescore.score")
+    def score_results(self, emotion_result, topic_result):
+        """Builds the Adorescore result from emotion & topic results."""
+
+        # Extract emotion data
+        primary_emotion = emotion_result.primary
+        secondary_emotion = emotion_result.secondary
+
+        # Extract topic data
+        main_topics = topic_result.main
+        subtopics = topic_result.subtopics
+
+        # Compute Adorescore
+        if self.mode == "distribution" and emotion_result.probabilities is not None:
+            adorescore = self.distribution_score(emotion_result.probabilities)
+        else:
+            adorescore = self.top2_score(primary_emotion, secondary_emotion)
 
         # Normalize Adorescore
         adorescore = round(max(-100, min(100, adorescore)), 4)
@@ -101,44 +282,125 @@ class AdorescoreCalculator:
         topic_breakdown = self.compute_topic_breakdown(adorescore, main_topics)
 
         # Output final result
-        return {
-            "emotions": {
-                "primary": {
-                    "emotion": primary_emotion.get("emotion", ""),
-                    "activation": primary_emotion.get("activation", ""),
-                    "intensity": round(primary_emotion.get("intensity", 0), 4)
-                },
-                "secondary": {
-                    "emotion": secondary_emotion.get("emotion", ""),
-                    "activation": secondary_emotion.get("activation", ""),
-                    "intensity": round(secondary_emotion.get("intensity", 0), 4)
-                }
-            },
-            "topics": {
-                "main": main_topics,
-                "subtopics": subtopics
-            },
-            "adorescore": {
-                "overall": adorescore,
-                "breakdown": topic_breakdown
-            }
-        }
+        return AdorescoreResult(
+            primary=EmotionScore(
+                primary_emotion.emotion, primary_emotion.activation, round(primary_emotion.intensity, 4)
+            ) if primary_emotion else None,
+            secondary=EmotionScore(
+                secondary_emotion.emotion, secondary_emotion.activation, round(secondary_emotion.intensity, 4)
+            ) if secondary_emotion else None,
+            main=main_topics,
+            subtopics=subtopics,
+            overall=adorescore,
+            breakdown=topic_breakdown
+        )
 
     def compute_topic_breakdown(self, adorescore, main_topics):
         """Distributes the Adorescore across relevant topics based on their weights."""
         topic_breakdown = {}
-        total_weight = sum(self.topic_weights.get(topic, 0) for topic in main_topics) or 1
+        total_weight = sum(self.topic_weights.get(topic, self.default_topic_weight) for topic in main_topics) or 1
 
         for topic in main_topics:
-            weight = self.topic_weights.get(topic, 0) / total_weight
+            weight = self.topic_weights.get(topic, self.default_topic_weight) / total_weight
             topic_breakdown[topic] = round(adorescore * weight, 4)
 
         return topic_breakdown
 
+    # ---------------------- Columnar scoring ----------------------
+    def emotion_impacts(self, emotions, intensities, activations, weight_factor):
+        """compute_emotion_impact over label/intensity/activation arrays (same operation order)."""
+        count = len(intensities)
+        positive = np.fromiter(
+            (emotion in self.positive_emotions for emotion in np.asarray(emotions, dtype=object).tolist()),
+            dtype=bool, count=count
+        )
+        factors = np.fromiter(
+            (self.ACTIVATION_WEIGHTS.get(activation, 1.0) for activation in np.asarray(activations, dtype=object).tolist()),
+            dtype=float, count=count
+        )
+
+        impact = 100 * np.asarray(intensities, dtype=float) * weight_factor * factors
+        return np.where(positive, impact, -impact)
+
+    def topic_breakdown_columns(self, overall, columns, topic_weights=None):
+        """compute_topic_breakdown for a whole batch: (rows x columns.topics) matrix, NaN where a row lacks the topic."""
+        weights = self.topic_weights if topic_weights is None else topic_weights
+        default = self.default_topic_weight
+
+        # Summed left to right per distinct topic list, exactly like the scalar path
+        set_totals = np.array(
+            [sum(weights.get(topic, default) for topic in topics) or 1 for topics in columns.topic_sets], dtype=float
+        )
+        topic_weight = np.array([weights.get(topic, default) for topic in columns.topics], dtype=float)
+
+        rows, cols = np.nonzero(columns.topic_mask)
+        breakdown = np.full(columns.topic_mask.shape, np.nan)
+        breakdown[rows, cols] = _round4(
+            np.asarray(overall, dtype=float)[rows] * (topic_weight[cols] / set_totals[columns.topic_set_ids[rows]])
+        )
+        return breakdown
+
+    @instrumentation.timed("adorescore.score_columns")
+    def score_columns(self, columns, topic_weights=None):
+        """Overall Adorescores and topic breakdown matrix for a ScoreColumns batch.
+
+        Same numbers as score_results row by row; use columns.breakdown_dicts for per-row dicts.
+        """
+        overall = np.zeros(len(columns))
+        overall += np.where(columns.primary_emotion != "", self.emotion_impacts(
+            columns.primary_emotion, columns.primary_intensity, columns.primary_activation, 1.0
+        ), 0.0)
+        overall += np.where(columns.secondary_emotion != "", self.emotion_impacts(
+            columns.secondary_emotion, columns.secondary_intensity, columns.secondary_activation, 0.5
+        ), 0.0)
+
+        if self.mode == "distribution" and columns.probabilities is not None:
+            # Rows without a probability vector (NaN) keep their top-2 score, like score_results
+            probabilities = columns.probabilities.astype(np.float64)
+            totals = probabilities.sum(axis=1)
+            weighted = (probabilities * self.distribution_weights).sum(axis=1)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                distribution = np.where(totals != 0, weighted / totals, 0.0)
+            overall = np.where(np.isnan(totals), overall, distribution)
+
+        overall = _round4(np.clip(overall, -100, 100))
+        return overall, self.topic_breakdown_columns(overall, columns, topic_weights)
+
+    def reweight(self, results, topic_weights=None):
+        """Recomputes topic breakdowns of stored Adorescore results (objects or dicts) for new topic weights.
+
+        The overall score doesn't depend on topic weights, so only breakdowns are rebuilt;
+        dicts come back as dicts, objects as objects, and error entries pass through.
+        For millions of rows, keep the columns instead: ScoreColumns(topics, mask) + topic_breakdown_columns.
+        """
+        results = list(results)
+        valid = [i for i, result in enumerate(results) if not (isinstance(result, dict) and "error" in result)]
+        main, overall = [], []
+        for i in valid:
+            result = results[i]
+            if isinstance(result, dict):
+                main.append(result.get("topics", {}).get("main", []))
+                overall.append(result.get("adorescore", {}).get("overall", 0))
+            else:
+                main.append(result.main)
+                overall.append(result.overall)
+
+        columns = ScoreColumns.from_topic_lists(main)
+        breakdowns = columns.breakdown_dicts(self.topic_breakdown_columns(overall, columns, topic_weights))
+        for i, score, topic_breakdown in zip(valid, overall, breakdowns):
+            result = results[i]
+            if isinstance(result, dict):
+                results[i] = {**result, "adorescore": {"overall": score, "breakdown": topic_breakdown}}
+            else:
+                results[i] = AdorescoreResult(
+                    result.primary, result.secondary, result.main, result.subtopics, score, topic_breakdown
+                )
+        return results
+
 
 # Example Usage
 if __name__ == "__main__":
     calculator = AdorescoreCalculator()
     test_feedback = "The delivery was incredibly fast and the quality was amazing! However, one of the clothing items didn't fit well."
     result = calculator.calculate_adorescore(test_feedback)
-    print(json.dumps(result, indent=4))
+    print(result.to_json(indent=4) if isinstance(result, AdorescoreResult) else json.dumps(result, indent=4))
@@ -0,0 +1,283 @@
+import argparse
+import json
+import math
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+from results import AdorescoreResult
+
+# Set to a SQLite path to show dataset-level themes in the Streamlit app
+AGGREGATE_DB_ENV = "CUSTOMERVOICE_AGGREGATE_DB"
+
+ALL = "*"  # key/bucket used for dataset-wide (all-time) rollups
+UNKNOWN = "unknown"  # bucket for timestamps that can't be parsed
+GRANULARITIES = ("hour", "day", "week", "month")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS score_rollups (
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    mean REAL NOT NULL,
+    m2 REAL NOT NULL,
+    PRIMARY KEY (dimension, key, bucket)
+);
+CREATE TABLE IF NOT EXISTS emotion_histograms (
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    emotion TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (dimension, key, bucket, emotion)
+);
+"""
+
+# Chan et al. parallel merge of (count, mean, M2); SQLite evaluates every SET expression on the old row
+MERGE_ROLLUP = """
+INSERT INTO score_rollups (dimension, key, bucket, count, mean, m2) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (dimension, key, bucket) DO UPDATE SET
+    count = count + excluded.count,
+    mean = mean + (excluded.mean - mean) * excluded.count / (count + excluded.count),
+    m2 = m2 + excluded.m2 + (excluded.mean - mean) * (excluded.mean - mean) * count * excluded.count / (count + excluded.count)
+"""
+
+MERGE_HISTOGRAM = """
+INSERT INTO emotion_histograms (dimension, key, bucket, emotion, count) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (dimension, key, bucket, emotion) DO UPDATE SET count = count + excluded.count
+"""
+
+
+def parse_timestamp(timestamp):
+    """UTC datetime from a datetime, epoch seconds (number or numeric string) or ISO-8601 string.
+
+    Missing means now; anything unparseable returns None.
+    """
+    if timestamp is None or timestamp == "":
+        return datetime.now(timezone.utc)
+    try:
+        if isinstance(timestamp, str):
+            timestamp = timestamp.strip()
+            try:
+                # CSV cells are always strings, so epoch seconds arrive as e.g. "1704186000"
+                timestamp = float(timestamp)
+            except ValueError:
+                timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+        if isinstance(timestamp, (int, float)):
+            timestamp = datetime.fromtimestamp(timestamp, timezone.utc)
+    except (ValueError, OverflowError, OSError):
+        return None
+    if not isinstance(timestamp, datetime):
+        return None
+    return timestamp.astimezone(timezone.utc) if timestamp.tzinfo is not None else timestamp
+
+
+def time_bucket(timestamp, granularity="day"):
+    """Bucket label for a timestamp (see parse_timestamp); unparseable values go to UNKNOWN."""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity {granularity!r}, expected one of {GRANULARITIES}")
+    timestamp = parse_timestamp(timestamp)
+    if timestamp is None:
+        return UNKNOWN
+
+    if granularity == "hour":
+        return timestamp.strftime("%Y-%m-%dT%H")
+    if granularity == "day":
+        return timestamp.strftime("%Y-%m-%d")
+    if granularity == "week":
+        year, week, _ = timestamp.isocalendar()
+        return f"{year}-W{week:02d}"
+    return timestamp.strftime("%Y-%m")
+
+
+def rollup_keys(result):
+    """(dimension, key) pairs a single Adorescore result contributes to."""
+    keys = [("overall", ALL)]
+    keys.extend(("topic", topic) for topic in result.main)
+    keys.extend(
+        ("subtopic", f"{topic} / {subtopic}")
+        for topic, subtopics in result.subtopics.items()
+        for subtopic in subtopics
+    )
+    if result.primary and result.primary.emotion:
+        keys.append(("emotion", result.primary.emotion))
+    return keys
+
+
+class AggregateStore:
+    """SQLite rollups of Adorescore results by topic, subtopic, emotion and time bucket.
+
+    Each ingest merges a batch's (count, mean, M2) into the stored rows, so new batches
+    are appended without rescoring or re-reading anything already ingested.
+    """
+
+    def __init__(self, path, granularity="day"):
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity {granularity!r}, expected one of {GRANULARITIES}")
+        self.path = path
+        self.granularity = granularity
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def ingest(self, results, timestamps=None):
+        """Adds a batch of Adorescore results (objects or their dicts); returns how many were used."""
+        timestamps = timestamps if timestamps is not None else [None] * len(results)
+        rollups = {}
+        histograms = {}
+        ingested = 0
+
+        for result, timestamp in zip(results, timestamps):
+            if isinstance(result, dict):
+                if "error" in result:
+                    continue
+                result = AdorescoreResult.from_dict(result)
+            ingested += 1
+
+            value = float(result.overall)
+            emotion = result.primary.emotion if result.primary else ""
+            for bucket in (ALL, time_bucket(timestamp, self.granularity)):
+                for dimension, key in rollup_keys(result):
+                    # Welford update of this batch's partial aggregate
+                    entry = rollups.setdefault((dimension, key, bucket), [0, 0.0, 0.0])
+                    entry[0] += 1
+                    delta = value - entry[1]
+                    entry[1] += delta / entry[0]
+                    entry[2] += delta * (value - entry[1])
+
+                    if emotion:
+                        histogram_key = (dimension, key, bucket, emotion)
+                        histograms[histogram_key] = histograms.get(histogram_key, 0) + 1
+
+        with self._lock, self._db:
+            self._db.executemany(MERGE_ROLLUP, [(*key, *entry) for key, entry in rollups.items()])
+            self._db.executemany(MERGE_HISTOGRAM, [(*key, count) for key, count in histograms.items()])
+        return ingested
+
+    def _rows(self, query, params):
+        with self._lock:
+            return self._db.execute(query, params).fetchall()
+
+    @staticmethod
+    def _stats(row):
+        dimension, key, bucket, count, mean, m2 = row
+        variance = m2 / (count - 1) if count > 1 else 0.0
+        return {
+            "dimension": dimension,
+            "key": key,
+            "bucket": bucket,
+            "count": count,
+            "mean": round(mean, 4),
+            "variance": round(variance, 4),
+            "std": round(math.sqrt(variance), 4),
+        }
+
+    def summary(self, dimension="overall", key=ALL, bucket=ALL):
+        rows = self._rows(
+            "SELECT dimension, key, bucket, count, mean, m2 FROM score_rollups "
+            "WHERE dimension = ? AND key = ? AND bucket = ?",
+            (dimension, key, bucket)
+        )
+        return self._stats(rows[0]) if rows else None
+
+    def breakdown(self, dimension="topic", bucket=ALL, limit=None):
+        """Every key of a dimension (e.g. all topics) for one bucket, most frequent first."""
+        query = (
+            "SELECT dimension, key, bucket, count, mean, m2 FROM score_rollups "
+            "WHERE dimension = ? AND bucket = ? ORDER BY count DESC, key"
+        )
+        params = (dimension, bucket)
+        if limit:
+            query += " LIMIT ?"
+            params += (limit,)
+        return [self._stats(row) for row in self._rows(query, params)]
+
+    def top_themes(self, limit=5, bucket=ALL):
+        return self.breakdown("topic", bucket, limit)
+
+    def trend(self, dimension="overall", key=ALL, since=None, until=None):
+        """Per-time-bucket stats for one key, oldest first (buckets sort lexically); UNKNOWN is left out."""
+        query = (
+            "SELECT dimension, key, bucket, count, mean, m2 FROM score_rollups "
+            "WHERE dimension = ? AND key = ? AND bucket NOT IN (?, ?)"
+        )
+        params = (dimension, key, ALL, UNKNOWN)
+        if since:
+            query += " AND bucket >= ?"
+            params += (since,)
+        if until:
+            query += " AND bucket <= ?"
+            params += (until,)
+        return [self._stats(row) for row in self._rows(query + " ORDER BY bucket", params)]
+
+    def emotion_histogram(self, dimension="overall", key=ALL, bucket=ALL):
+        rows = self._rows(
+            "SELECT emotion, count FROM emotion_histograms "
+            "WHERE dimension = ? AND key = ? AND bucket = ? ORDER BY count DESC, emotion",
+            (dimension, key, bucket)
+        )
+        return dict(rows)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def ingest_jsonl(store, path, batch_size=10000, timestamp_field="timestamp"):
+    """Streams a cli.py JSONL output file into the store in batches."""
+    total = 0
+    results, timestamps = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            results.append(record.get("result", record))
+            timestamps.append(record.get(timestamp_field))
+            if len(results) >= batch_size:
+                total += store.ingest(results, timestamps)
+                results, timestamps = [], []
+    if results:
+        total += store.ingest(results, timestamps)
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dataset-level Adorescore & theme rollups.")
+    parser.add_argument("--db", required=True, help="SQLite file holding the rollups")
+    parser.add_argument("--granularity", choices=GRANULARITIES, default="day")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="Add a cli.py JSONL results file")
+    ingest.add_argument("path")
+    ingest.add_argument("--timestamp-field", default="timestamp")
+
+    top = commands.add_parser("top", help="Most frequent themes with mean/variance of Adorescore")
+    top.add_argument("--limit", type=int, default=10)
+    top.add_argument("--bucket", default=ALL)
+
+    trend = commands.add_parser("trend", help="Adorescore per time bucket")
+    trend.add_argument("--dimension", default="overall", choices=["overall", "topic", "subtopic", "emotion"])
+    trend.add_argument("--key", default=ALL)
+
+    args = parser.parse_args(argv)
+    store = AggregateStore(args.db, granularity=args.granularity)
+    try:
+        if args.command == "ingest":
+            output = {"ingested": ingest_jsonl(store, args.path, timestamp_field=args.timestamp_field)}
+        elif args.command == "top":
+            output = {
+                "overall": store.summary(bucket=args.bucket),
+                "themes": store.top_themes(args.limit, args.bucket),
+                "emotions": store.emotion_histogram(bucket=args.bucket),
+            }
+        else:
+            output = store.trend(args.dimension, args.key)
+    finally:
+        store.close()
+    print(json.dumps(output, indent=4))
+
+
+if __name__ == "__main__":
+    main()
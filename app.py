@@ -1,4 +1,9 @@
 import asyncio
+import gzip
+import io
+import os
+import shutil
+import tempfile
 try:
     asyncio.get_running_loop()
 except RuntimeError:
@@ -7,81 +12,65 @@ except RuntimeError:
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from googletrans import Translator
-import json
-from langdetect import detect
-
-# ---------------------- Utility Functions ----------------------
-def detect_language(text):
-    try:
-        return detect(text)
-    except:
-        return "unknown"
-
-def translate_text(text, target_lang="en"):
-    try:
-        translator = Translator()
-        translated = translator.translate(text, dest=target_lang)
-        return translated.text
-    except:
-        return text  # Return original if translation fails
+import aggregates
+import instrumentation
+import jobs
+import models
+import result_cache
+import translation
+from cli import ChunkScorer
+from emotion import EmotionAnalyzer
+from topic import TopicAnalyzer
+from adorescore import ADORESCORE_MODES, AdorescoreCalculator
 
-# ---------------------- Streamlit UI ----------------------
-st.set_page_config(page_title="Emotion Analysis", layout="wide")
 
-st.title("Customer Feedback Analysis")
-st.write("Analyze customer emotions, topics, and sentiment scoring.")
+# ---------------------- Cached resources & results ----------------------
+@st.cache_resource(show_spinner="Loading models...")
+def load_analyzers():
+    """Analyzers built once per server process and shared by every session and rerun."""
+    load_timings = models.warm_up()
+    return EmotionAnalyzer(), TopicAnalyzer(), load_timings
 
-# ------ User Input ------
-feedback = st.text_area("Enter Customer Feedback(any language):",
-                        "The delivery was incredibly fast and the quality was amazing! However, one of the clothing items didn't fit well.")
 
-if st.button("Analyze Feedback"):
-    from emotion import EmotionAnalyzer
-    from topic import TopicAnalyzer
-    from adorescore import AdorescoreCalculator
-    
-    detected_lang = detect_language(feedback)
-    translated_feedback = feedback if detected_lang == "en" else translate_text(feedback)
-    
+@st.cache_resource
+def get_calculator(mode):
+    emotion_analyzer, topic_analyzer, _ = load_analyzers()
+    return AdorescoreCalculator(emotion_analyzer=emotion_analyzer, topic_analyzer=topic_analyzer, mode=mode)
+
+
+@st.cache_data(max_entries=1024, show_spinner="Analyzing feedback...")
+def analyze(translated_feedback, mode):
+    """Emotions, topics & Adorescore for one already-translated feedback, memoized per (text, mode).
+
+    Translation stays outside: a failed translation falls back to the original text without
+    being cached, and memoizing the analysis of that text here would stop it being retried.
+    """
+    calculator = get_calculator(mode)
+    # Step 1 & 2: Emotion & Topic Analysis (shared analyzers, see load_analyzers)
+    emotion_result = calculator.emotion_analyzer.analyze_feedback(translated_feedback)
+    topic_result = calculator.topic_analyzer.analyze_feedback(translated_feedback)
+    # Step 3: Adorescore Calculation (reuses the results from steps 1-2)
+    adorescore_result = calculator.calculate_adorescore_from_results(emotion_result, topic_result)
+    return emotion_result, topic_result, adorescore_result
+
+
+def render_analysis(feedback, mode):
+    # Timings are collected around the cached call, so a cache hit shows only translation & the lookup
+    with instrumentation.collect() as request_timings, instrumentation.stage("request.total"):
+        languages, translated = translation.get_stage().process([feedback])
+        detected_lang, translated_feedback = languages[0], translated[0]
+        emotion_result, topic_result, adorescore_result = analyze(translated_feedback, mode)
+
     if detected_lang != "en":
         st.write(f"🔄 Translated Feedback: **{translated_feedback}**")
-    
-    # Step 1: Emotion Analysis
-    emotion_analyzer = EmotionAnalyzer()
-    emotion_result = emotion_analyzer.analyze_feedback(translated_feedback)
-    
-    try:
-        emotion_result = json.loads(emotion_result) if isinstance(emotion_result, str) else emotion_result
-    except json.JSONDecodeError:
-        st.error("Error processing emotion analysis.")
-        st.stop()
-    
-    categorized_emotions = emotion_result.get("categorized_emotions", {"High Activation": [], "Medium Activation": [], "Low Activation": []})
-    
-    # Step 2: Topic Analysis
-    topic_analyzer = TopicAnalyzer()
-    topic_result = topic_analyzer.analyze_feedback(translated_feedback)
-    
-    try:
-        topic_result = json.loads(topic_result) if isinstance(topic_result, str) else topic_result
-    except json.JSONDecodeError:
-        st.error("Error processing topic analysis.")
-        st.stop()
-    
-    topics = topic_result.get("topics", {"main": [], "subtopics": {}})
-    
-    # Step 3: Adorescore Calculation
-    adore_analyzer = AdorescoreCalculator()
-    adorescore_result = adore_analyzer.calculate_adorescore(translated_feedback)
-    
-    try:
-        adorescore_result = json.loads(adorescore_result) if isinstance(adorescore_result, str) else adorescore_result
-    except json.JSONDecodeError:
+
+    if isinstance(adorescore_result, dict):
         st.error("Error processing Adorescore calculation.")
-        st.stop()
-    
-    adorescore = adorescore_result.get("adorescore", {"overall": 0})
+        return
+
+    categorized_emotions = emotion_result.categorized
+    topics = {"main": topic_result.main, "subtopics": topic_result.subtopics}
+
     # ------ Mapping Emotions to Topics ------
     emotion_topic_map = {}
     for theme in topics["main"]:
@@ -90,9 +79,9 @@ if st.button("Analyze Feedback"):
             "subtopics": topics["subtopics"].get(theme, [])
         }
 
-        for emotion_category in ["High Activation", "Medium Activation", "Low Activation"]:
+        for emotion_category in ["High", "Medium", "Low"]:
             for emotion in categorized_emotions[emotion_category]:
-                emotion_topic_map[theme]["dominant_emotions"].append(emotion["emotion"])
+                emotion_topic_map[theme]["dominant_emotions"].append(emotion.emotion)
 
     # ------ UI Layout ------
     col1, col2, col3, col4 = st.columns(4)
@@ -101,22 +90,38 @@ if st.button("Analyze Feedback"):
     def create_radar_chart(emotion_list, title):
         if not emotion_list:
             return None
-        df = pd.DataFrame(emotion_list)
+        df = pd.DataFrame({
+            "emotion": [score.emotion for score in emotion_list],
+            "intensity": [score.intensity for score in emotion_list]
+        })
         fig = px.line_polar(df, r="intensity", theta="emotion", line_close=True, title=title)
         fig.update_traces(fill="toself")
         return fig
 
-    if categorized_emotions["High Activation"]:
-        col1.plotly_chart(create_radar_chart(categorized_emotions["High Activation"], "High Activation Emotions"), use_container_width=True)
-    if categorized_emotions["Medium Activation"]:
-        col2.plotly_chart(create_radar_chart(categorized_emotions["Medium Activation"], "Medium Activation Emotions"), use_container_width=True)
-    if categorized_emotions["Low Activation"]:
-        col3.plotly_chart(create_radar_chart(categorized_emotions["Low Activation"], "Low Activation Emotions"), use_container_width=True)
+    if categorized_emotions["High"]:
+        col1.plotly_chart(create_radar_chart(categorized_emotions["High"], "High Activation Emotions"), use_container_width=True)
+    if categorized_emotions["Medium"]:
+        col2.plotly_chart(create_radar_chart(categorized_emotions["Medium"], "Medium Activation Emotions"), use_container_width=True)
+    if categorized_emotions["Low"]:
+        col3.plotly_chart(create_radar_chart(categorized_emotions["Low"], "Low Activation Emotions"), use_container_width=True)
 
     with col4:
-        st.metric(label="🚀 Adorescore", value=f"{adorescore.get('overall', 0):.2f}")
+        st.metric(label="🚀 Adorescore", value=f"{adorescore_result.overall:.2f}")
         st.subheader("Top Themes in Dataset")
-        if topics["main"]:
+        dataset_themes = []
+        aggregate_db = os.environ.get(aggregates.AGGREGATE_DB_ENV)
+        if aggregate_db and os.path.exists(aggregate_db):
+            # Rollups built offline with `aggregates.py ingest`; a handful of indexed rows per query
+            store = aggregates.AggregateStore(aggregate_db)
+            try:
+                dataset_themes = store.top_themes(limit=5)
+            finally:
+                store.close()
+
+        if dataset_themes:
+            for theme in dataset_themes:
+                st.write(f"🔹 **{theme['key']}** · {theme['count']} reviews · avg {theme['mean']:.2f} (±{theme['std']:.2f})")
+        elif topics["main"]:
             for theme in topics["main"]:
                 st.write(f"🔹 **{theme}**")
         else:
@@ -150,24 +155,24 @@ if st.button("Analyze Feedback"):
 
         col1, col2 = st.columns(2)
         with col1:
-            primary_emotion = adorescore_result.get("emotions", {}).get("primary", {})
+            primary_emotion = adorescore_result.primary
             if primary_emotion:
-                st.markdown(f"💡 **Primary Emotion:** {primary_emotion.get('emotion', 'N/A').title()}")
-                st.write(f"-  Activation: {primary_emotion.get('activation', 'N/A')}")
-                st.write(f"-  Intensity: {primary_emotion.get('intensity', 0):.4f}")
+                st.markdown(f"💡 **Primary Emotion:** {primary_emotion.emotion.title()}")
+                st.write(f"-  Activation: {primary_emotion.activation}")
+                st.write(f"-  Intensity: {primary_emotion.intensity:.4f}")
 
         with col2:
-            secondary_emotion = adorescore_result.get("emotions", {}).get("secondary", {})
+            secondary_emotion = adorescore_result.secondary
             if secondary_emotion:
-                st.markdown(f"🧐 **Secondary Emotion:** {secondary_emotion.get('emotion', 'N/A').title()}")
-                st.write(f" -  Activation: {secondary_emotion.get('activation', 'N/A')}")
-                st.write(f" -  Intensity: {secondary_emotion.get('intensity', 0):.4f}")
+                st.markdown(f"🧐 **Secondary Emotion:** {secondary_emotion.emotion.title()}")
+                st.write(f" -  Activation: {secondary_emotion.activation}")
+                st.write(f" -  Intensity: {secondary_emotion.intensity:.4f}")
 
         st.subheader("🚀 Topic Breakdown")
 
-        topics = adorescore_result.get("topics", {}).get("main", [])
-        subtopics = adorescore_result.get("topics", {}).get("subtopics", {})
-        breakdown = adorescore_result.get("adorescore", {}).get("breakdown", {})
+        topics = adorescore_result.main
+        subtopics = adorescore_result.subtopics
+        breakdown = adorescore_result.breakdown
 
         if topics:
             for topic in topics:
@@ -184,19 +189,182 @@ if st.button("Analyze Feedback"):
             st.write("No topics found.")   
     # ------ Summary ------
     st.subheader("🚀 Emotion & Sentiment Summary")
-    primary_emotion = emotion_result.get("emotion_analysis", {}).get("emotions", {}).get("primary", {})
-    secondary_emotion = emotion_result.get("emotion_analysis", {}).get("emotions", {}).get("secondary", {})
+    primary_emotion = emotion_result.primary
+    secondary_emotion = emotion_result.secondary
 
     if primary_emotion:
-        st.write(f"💡 **Primary Emotion:** {primary_emotion.get('emotion', 'N/A').title()} "
-                 f"(Activation: {primary_emotion.get('activation', 'N/A')}, "
-                 f"Intensity: {primary_emotion.get('intensity', 0):.4f})")
+        st.write(f"💡 **Primary Emotion:** {primary_emotion.emotion.title()} "
+                 f"(Activation: {primary_emotion.activation}, "
+                 f"Intensity: {primary_emotion.intensity:.4f})")
 
     if secondary_emotion:
-        st.write(f"🧐 **Secondary Emotion:** {secondary_emotion.get('emotion', 'N/A').title()} "
-                 f"(Activation: {secondary_emotion.get('activation', 'N/A')}, "
-                 f"Intensity: {secondary_emotion.get('intensity', 0):.4f})")
+        st.write(f"🧐 **Secondary Emotion:** {secondary_emotion.emotion.title()} "
+                 f"(Activation: {secondary_emotion.activation}, "
+                 f"Intensity: {secondary_emotion.intensity:.4f})")
+
+    if emotion_result.sentences:
+        with st.expander("📝 Sentence-level Emotions"):
+            st.dataframe(pd.DataFrame([
+                {"sentence": sentence.text, "emotion": sentence.primary.emotion,
+                 "intensity": sentence.primary.intensity}
+                for sentence in emotion_result.sentences
+            ]), use_container_width=True)
+
+    # ------ Per-request Timings ------
+    with st.expander("⏱️ Request Timings"):
+        if not any(name.startswith(("emotion.", "topic.", "adorescore.")) for name in request_timings):
+            st.caption("Analysis served from the result cache; no model stages ran for this request.")
+        if request_timings:
+            st.dataframe(pd.DataFrame([
+                {"stage": name, "calls": values["calls"], "items": values["items"],
+                 "ms": round(values["seconds"] * 1000, 2)}
+                for name, values in request_timings.items()
+            ]), use_container_width=True)
+        else:
+            st.write("No timings recorded.")
+
+
+
+def preview_row(record):
+    """Flat table row for one cli.py output record."""
+    result = record["result"]
+    row = {"row": record["row"], "id": record["id"], "language": record["language"]}
+    if "error" in result:
+        return {**row, "adorescore": None, "primary emotion": None, "topics": None, "error": result["error"]}
+    return {
+        **row,
+        "adorescore": result["adorescore"]["overall"],
+        "primary emotion": result["emotions"]["primary"]["emotion"],
+        "topics": ", ".join(result["topics"]["main"]),
+        "text": record["text"],
+    }
+
+
+def render_job_progress():
+    """Progress, cancel button & preview of the session's background job."""
+    job = st.session_state.get("bulk_job")
+    if job is None:
+        st.info("Upload a CSV or JSONL export to score it in the background.")
+        return
+
+    progress = job.progress()
+    total = "?" if progress["total"] is None else progress["total"]
+    st.progress(progress["fraction"], text=(
+        f"{progress['status'].title()}: {progress['processed']}/{total} rows "
+        f"· {progress['rows_per_sec']} rows/s · {progress['seconds']}s"
+    ))
+    if progress["status"] == "running":
+        st.button("Cancel", on_click=job.cancel)
+    elif progress["status"] == "failed":
+        st.error(f"Scoring failed: {progress['error']}")
+
+    preview = job.preview()
+    if preview:
+        df = pd.DataFrame([preview_row(record) for record in preview])
+        scored = df["adorescore"].dropna()
+        if len(scored):
+            st.metric("Average Adorescore (latest rows)", f"{scored.mean():.2f}")
+        st.dataframe(df.iloc[::-1], use_container_width=True, hide_index=True)
+
+
+@st.fragment(run_every=1.0)
+def poll_job_progress():
+    """Only rendered while a job runs, so nothing reruns on a timer otherwise."""
+    render_job_progress()
+    # One full rerun when the job ends so polling stops and the download button appears
+    if st.session_state["bulk_job"].status != "running":
+        st.rerun()
+
+
+@st.cache_resource
+def jobs_directory():
+    """Scratch directory for uploads & results, removed when the server process exits."""
+    return tempfile.TemporaryDirectory(prefix="customervoice-")
+
+
+@st.cache_data(max_entries=4, show_spinner="Preparing download...")
+def compressed_results(path, modified):
+    """Gzipped results file, built once per finished job rather than re-read on every rerun."""
+    buffer = io.BytesIO()
+    with open(path, "rb") as source, gzip.GzipFile(fileobj=buffer, mode="wb") as target:
+        shutil.copyfileobj(source, target)
+    return buffer.getvalue()
+
+
+# ---------------------- Streamlit UI ----------------------
+st.set_page_config(page_title="Emotion Analysis", layout="wide")
+
+st.title("Customer Feedback Analysis")
+st.write("Analyze customer emotions, topics, and sentiment scoring.")
+
+# Models are cached resources, so only the first session pays the load cost
+_, _, load_timings = load_analyzers()
+
+with st.sidebar.expander("⏱️ Model load times"):
+    for model_key, seconds in load_timings.items():
+        st.write(f"{model_key}: {seconds:.2f}s")
+
+with st.sidebar.expander("🗃️ Cache stats"):
+    for namespace, stats in result_cache.cache_stats().items():
+        st.write(f"{namespace}: {stats['hits'] + stats['disk_hits']} hits / {stats['misses']} misses "
+                 f"({stats['evictions']} evicted)")
+
+adorescore_mode = st.sidebar.radio(
+    "Adorescore mode", ADORESCORE_MODES,
+    help="top2: primary & secondary emotion only; distribution: all 28 emotion probabilities"
+)
+
+single_tab, bulk_tab = st.tabs(["🔍 Single Feedback", "📂 Bulk Upload"])
+
+with single_tab:
+    # ------ User Input ------
+    feedback = st.text_area("Enter Customer Feedback(any language):",
+                            "The delivery was incredibly fast and the quality was amazing! However, one of the clothing items didn't fit well.")
+
+    # Kept in session state so the results survive reruns triggered elsewhere on the page
+    if st.button("Analyze Feedback"):
+        st.session_state["analyzed_feedback"] = feedback
+    if st.session_state.get("analyzed_feedback"):
+        render_analysis(st.session_state["analyzed_feedback"], adorescore_mode)
+
+with bulk_tab:
+    uploaded = st.file_uploader("Feedback export", type=["csv", "jsonl"])
+    text_column = st.text_input("Text column", "feedback")
+    id_column = st.text_input("ID column (optional)", "")
+
+    job = st.session_state.get("bulk_job")
+    running = job is not None and job.status == "running"
+    if st.button("Start Scoring", disabled=uploaded is None or running):
+        # The previous job's upload and results are no longer reachable from this session
+        if st.session_state.get("bulk_job_dir"):
+            shutil.rmtree(st.session_state["bulk_job_dir"], ignore_errors=True)
+        job_dir = tempfile.mkdtemp(dir=jobs_directory().name)
+        st.session_state["bulk_job_dir"] = job_dir
+        input_path = os.path.join(job_dir, os.path.basename(uploaded.name))
+        with open(input_path, "wb") as f:
+            f.write(uploaded.getbuffer())
+
+        aggregate_db = os.environ.get(aggregates.AGGREGATE_DB_ENV)
+        job = jobs.ScoringJob(
+            input_path, os.path.join(job_dir, "results.jsonl"),
+            ChunkScorer(calculator=get_calculator(adorescore_mode)),
+            text_column=text_column,
+            id_column=id_column or None,
+            aggregate_store=aggregates.AggregateStore(aggregate_db) if aggregate_db else None
+        )
+        st.session_state["bulk_job"] = job.start()
+
+    job = st.session_state.get("bulk_job")
+    if job is not None and job.status == "running":
+        poll_job_progress()
+    else:
+        render_job_progress()
+
+    if job is not None and job.status in ("done", "cancelled") and os.path.exists(job.output_path):
+        st.download_button("Download results (JSONL, gzip)",
+                           compressed_results(job.output_path, os.path.getmtime(job.output_path)),
+                           file_name="results.jsonl.gz", mime="application/gzip")
 
-    # Footer
-    st.markdown("---")
-    st.caption("📊 Built with Streamlit | © 2025")
\ No newline at end of file
+# Footer
+st.markdown("---")
+st.caption("📊 Built with Streamlit | © 2025")
@@ -0,0 +1,267 @@
+import argparse
+import hashlib
+import json
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import models
+from loadtest import latency_summary
+
+# ---------------------- Synthetic corpus ----------------------
+SENTENCES = {
+    "en": [
+        "The delivery was incredibly fast.",
+        "The quality of the fabric is amazing.",
+        "One of the clothing items didn't fit well.",
+        "Customer service was rude and slow to respond.",
+        "The price is too expensive for what you get.",
+        "The app is easy to use and intuitive.",
+        "My package arrived damaged.",
+        "Returning the shoes was a frustrating experience.",
+        "Great discounts during the sale!",
+        "The refund process took weeks.",
+        "Honestly I expected more from this brand.",
+        "Thank you for the quick exchange.",
+    ],
+    "es": [
+        "La entrega fue muy rápida.",
+        "La calidad del producto es excelente.",
+        "El servicio al cliente fue terrible.",
+        "El paquete llegó dañado.",
+    ],
+    "fr": [
+        "La livraison était très rapide.",
+        "Le service client était désagréable.",
+        "La taille ne correspond pas du tout.",
+        "Le prix est trop élevé.",
+    ],
+    "de": [
+        "Die Lieferung war sehr schnell.",
+        "Die Qualität ist leider schlecht.",
+        "Der Kundenservice war sehr hilfreich.",
+    ],
+}
+
+
+def synthetic_corpus(size=200, seed=0, max_sentences=12, non_english_share=0.2):
+    """Feedback of varied length (1..max_sentences sentences) with a share of non-English texts."""
+    rng = random.Random(seed)
+    other_languages = [lang for lang in SENTENCES if lang != "en"]
+    corpus = []
+    for _ in range(size):
+        language = rng.choice(other_languages) if rng.random() < non_english_share else "en"
+        # Skew towards short reviews, with a long tail like real survey exports
+        length = min(max_sentences, 1 + int(rng.expovariate(1 / 2.5)))
+        corpus.append({"language": language, "text": " ".join(rng.choice(SENTENCES[language]) for _ in range(length))})
+    return corpus
+
+
+# ---------------------- Measurements ----------------------
+def peak_rss_mb():
+    """Peak resident set size of this process so far (ru_maxrss is KB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def time_per_item(fn, items, repeat=1):
+    latencies = []
+    for _ in range(repeat):
+        for item in items:
+            start = time.perf_counter()
+            fn(item)
+            latencies.append(time.perf_counter() - start)
+    return latency_summary(latencies)
+
+
+def throughput(batch_fn, items, batch_sizes):
+    """Items/sec of batch_fn(items, batch_size) at each batch size."""
+    report = {}
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        batch_fn(items, batch_size)
+        seconds = time.perf_counter() - start
+        report[str(batch_size)] = round(len(items) / seconds, 2) if seconds else 0.0
+    return report
+
+
+def cold_start(backend):
+    """Seconds to load each model and build each analyzer from an empty registry."""
+    from emotion import EmotionAnalyzer
+    from topic import TopicAnalyzer
+
+    models.clear()
+    start = time.perf_counter()
+    emotion_analyzer = EmotionAnalyzer(cache=False, backend=backend)
+    emotion_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    topic_analyzer = TopicAnalyzer(cache=False)
+    topic_seconds = time.perf_counter() - start
+
+    report = {
+        "emotion_analyzer_seconds": round(emotion_seconds, 4),
+        "topic_analyzer_seconds": round(topic_seconds, 4),
+        "model_load_seconds": models.load_timings(),
+        "peak_rss_mb_after_load": peak_rss_mb(),
+    }
+    return report, emotion_analyzer, topic_analyzer
+
+
+def run(corpus_size=200, seed=0, batch_sizes=(1, 8, 32, 64), backend=None, translation_backend="stub"):
+    """Runs every benchmark over one synthetic corpus and returns a JSON-serializable report."""
+    from adorescore import AdorescoreCalculator
+    from cli import ChunkScorer
+
+    backend = backend or models.default_emotion_backend()
+    corpus = synthetic_corpus(corpus_size, seed)
+    texts = [item["text"] for item in corpus]
+    english = [item["text"] for item in corpus if item["language"] == "en"]
+
+    startup, emotion_analyzer, topic_analyzer = cold_start(backend)
+    calculator = AdorescoreCalculator(emotion_analyzer=emotion_analyzer, topic_analyzer=topic_analyzer)
+    pipeline = ChunkScorer(calculator=calculator, translation_backend=translation_backend, batch_size=max(batch_sizes))
+    pipeline.translation.cache = None  # Measure translation every time, like the analyzers
+
+    keywords = [topic_analyzer.extract_keywords(text) for text in english]
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "emotion_model": emotion_analyzer.model_name,
+            "emotion_backend": backend,
+            "topic_model": topic_analyzer.spacy_model,
+            "topic_cache_version": topic_analyzer.cache_version,
+            "translation_backend": translation_backend,
+            "corpus_size": corpus_size,
+            "seed": seed,
+            "mean_chars": round(sum(map(len, texts)) / len(texts), 1),
+        },
+        "cold_start": startup,
+        "latency": {
+            "emotion.analyze_feedback": time_per_item(emotion_analyzer.analyze_feedback, english),
+            "topic.match_main_topic": time_per_item(topic_analyzer.match_main_topic, keywords),
+            "adorescore.calculate_adorescore": time_per_item(calculator.calculate_adorescore, english),
+            "pipeline.end_to_end": time_per_item(lambda text: pipeline([text]), texts),
+        },
+        "throughput_items_per_sec": {
+            "emotion.analyze_batch": throughput(emotion_analyzer.analyze_batch, english, batch_sizes),
+            "topic.analyze_batch": throughput(topic_analyzer.analyze_batch, english, batch_sizes),
+            "adorescore.analyze_batch": throughput(calculator.analyze_batch, english, batch_sizes),
+        },
+    }
+    report["peak_rss_mb"] = peak_rss_mb()
+    return report
+
+
+def topic_pipeline_variant(variant, corpus_size=200, seed=0, spacy_model=models.TOPIC_SPACY_MODEL):
+    """Startup & latency of TopicAnalyzer with the full ("full") or trimmed ("light") spaCy pipeline.
+
+    Meant to run in a fresh process so import time and RSS aren't shared with other runs.
+    """
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    import spacy  # noqa: F401
+    from topic import TopicAnalyzer
+    import_seconds = time.perf_counter() - start
+
+    exclude = models.TOPIC_PIPELINE_EXCLUDE if variant == "light" else ()
+    start = time.perf_counter()
+    analyzer = TopicAnalyzer(spacy_model=spacy_model, cache=False, exclude=exclude)
+    init_seconds = time.perf_counter() - start
+    rss_after_load = peak_rss_mb()
+
+    texts = [item["text"] for item in synthetic_corpus(corpus_size, seed) if item["language"] == "en"]
+    latency = time_per_item(analyzer.analyze_feedback, texts)
+    results = json.dumps([analyzer.analyze_feedback(text).to_dict() for text in texts], sort_keys=True)
+
+    return {
+        "spacy_model": spacy_model,
+        "components": analyzer.nlp.pipe_names,
+        "import_seconds": round(import_seconds, 4),
+        "init_seconds": round(init_seconds, 4),
+        "rss_mb_before": rss_before,
+        "peak_rss_mb_after_load": rss_after_load,
+        "latency": latency,
+        "results_sha256": hashlib.sha256(results.encode("utf-8")).hexdigest(),
+    }
+
+
+def compare_topic_pipelines(corpus_size=200, seed=0, spacy_model=models.TOPIC_SPACY_MODEL):
+    """Runs each topic pipeline variant in its own interpreter and checks the outputs match."""
+    report = {}
+    for variant in ("full", "light"):
+        completed = subprocess.run(
+            [sys.executable, __file__, "--topic-pipeline-variant", variant,
+             "--corpus-size", str(corpus_size), "--seed", str(seed), "--spacy-model", spacy_model],
+            capture_output=True, text=True, check=True
+        )
+        report[variant] = json.loads(completed.stdout)
+    report["identical_results"] = report["full"]["results_sha256"] == report["light"]["results_sha256"]
+    return report
+
+
+def compare(report, baseline, max_regression=0.2):
+    """p50 latencies that got slower than baseline by more than max_regression (a fraction)."""
+    regressions = {}
+    for name, current in report["latency"].items():
+        previous = baseline.get("latency", {}).get(name)
+        if previous and previous["p50_ms"] and current["p50_ms"] > previous["p50_ms"] * (1 + max_regression):
+            regressions[name] = {"baseline_p50_ms": previous["p50_ms"], "p50_ms": current["p50_ms"]}
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark emotion, topic, Adorescore and end-to-end latency.")
+    parser.add_argument("--corpus-size", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--backend", choices=models.EMOTION_BACKENDS, default=None)
+    parser.add_argument("--translation-backend", choices=["stub", "googletrans"], default="stub",
+                        help="stub keeps the benchmark offline and deterministic")
+    parser.add_argument("--topic-pipeline", action="store_true",
+                        help="Only compare full vs trimmed spaCy pipelines for TopicAnalyzer")
+    parser.add_argument("--topic-pipeline-variant", choices=["full", "light"], help=argparse.SUPPRESS)
+    parser.add_argument("--spacy-model", default=models.TOPIC_SPACY_MODEL,
+                        help="spaCy package or path for --topic-pipeline (default: %(default)s)")
+    parser.add_argument("-o", "--output", help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", help="Previous JSON report to check for latency regressions")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed p50 slowdown vs baseline (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    if args.topic_pipeline_variant:
+        print(json.dumps(topic_pipeline_variant(
+            args.topic_pipeline_variant, args.corpus_size, args.seed, args.spacy_model
+        )))
+        return
+    if args.topic_pipeline:
+        report = compare_topic_pipelines(args.corpus_size, args.seed, args.spacy_model)
+    else:
+        report = run(args.corpus_size, args.seed, args.batch_sizes, args.backend, args.translation_backend)
+
+    regressions = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.max_regression)
+        report["regressions"] = regressions
+
+    output = json.dumps(report, indent=4)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if regressions:
+        print(f"Latency regressions vs baseline: {', '.join(regressions)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+import argparse
+import contextlib
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from itertools import islice
+
+import instrumentation
+from results import AdorescoreResult
+
+
+# ---------------------- Input ----------------------
+def _parse_json_line(path, number, line):
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"{os.path.basename(path)} line {number}: invalid JSON ({e.msg})") from e
+
+
+def read_rows(path, fmt=None, start=0):
+    """Streams (offset, row) pairs from a CSV or JSONL file, skipping the first `start` rows."""
+    fmt = fmt or ("jsonl" if path.endswith((".jsonl", ".json")) else "csv")
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            rows = csv.DictReader(f)
+        elif fmt == "jsonl":
+            rows = (_parse_json_line(path, number, line) for number, line in enumerate(f, 1) if line.strip())
+        else:
+            raise ValueError(f"Unsupported input format: {fmt}")
+
+        for offset, row in enumerate(rows):
+            if offset >= start:
+                yield offset, row
+
+
+def chunked(iterable, size):
+    """Yields lists of at most `size` items so memory stays bounded."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# ---------------------- Output ----------------------
+class JsonlWriter:
+    """Appends one JSON record per line; resumable by truncating to the last checkpoint."""
+
+    def __init__(self, path, resume_bytes=None):
+        self.path = path
+        if resume_bytes is not None:
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            if size < resume_bytes:
+                # Truncating up to the checkpoint would pad the file with NUL bytes
+                raise ValueError(
+                    f"Cannot resume: {path} has {size} bytes but its checkpoint expects at least {resume_bytes}; "
+                    f"restore the output file or rerun without --resume"
+                )
+        mode = "a" if resume_bytes is not None else "w"
+        self.file = open(path, mode, encoding="utf-8")
+        if resume_bytes is not None:
+            # Drop anything written after the last checkpoint (e.g. a half-written chunk)
+            self.file.truncate(resume_bytes)
+            self.file.seek(resume_bytes)
+
+    def write(self, records):
+        for record in records:
+            self.file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+            self.file.write("\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def position(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    """Writes each chunk as its own part file in an output directory (Parquet can't be appended to)."""
+
+    def __init__(self, path, resume_bytes=None):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError("Parquet output requires `pip install pyarrow`") from e
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, records):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not records:
+            return
+        table = pa.Table.from_pylist([
+            {
+                "row": record["row"],
+                "id": None if record["id"] is None else str(record["id"]),
+                "language": record["language"],
+                "original_text": record.get("original_text"),
+                "text": record["text"],
+                "adorescore": record["result"].get("adorescore", {}).get("overall"),
+                "result": json.dumps(record["result"], ensure_ascii=False, separators=(",", ":")),
+            }
+            for record in records
+        ])
+        pq.write_table(table, os.path.join(self.path, f"part-{records[0]['row']:012d}.parquet"))
+
+    def position(self):
+        return None
+
+    def close(self):
+        pass
+
+
+def load_checkpoint(output_path):
+    checkpoint_path = f"{output_path}.checkpoint"
+    if not os.path.exists(checkpoint_path):
+        return None
+    with open(checkpoint_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_checkpoint(output_path, offset, position):
+    """Atomically records how many input rows are safely written."""
+    checkpoint_path = f"{output_path}.checkpoint"
+    tmp_path = f"{checkpoint_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"offset": offset, "bytes": position}, f)
+    os.replace(tmp_path, checkpoint_path)
+
+
+# ---------------------- Scoring ----------------------
+class ChunkScorer:
+    """Runs language detection, translation and Adorescore scoring over one chunk of texts."""
+
+    def __init__(self, calculator=None, translate=True, batch_size=32, translation_backend="googletrans",
+                 translation_cache=None):
+        from adorescore import AdorescoreCalculator
+        import translation
+        self.calculator = calculator or AdorescoreCalculator()
+        # translation_cache=False translates every text (e.g. load tests of the uncached path)
+        self.translation = translation.TranslationStage(
+            backend=translation.BACKENDS[translation_backend](), cache=translation_cache, batch_size=batch_size
+        ) if translate else None
+        self.batch_size = batch_size
+
+    def __call__(self, texts):
+        texts = list(texts)
+        if self.translation is not None:
+            languages, translated = self.translation.process(texts)
+        else:
+            languages, translated = ["en"] * len(texts), texts
+
+        results = self.calculator.analyze_batch(translated, batch_size=self.batch_size)
+        return list(zip(languages, translated, results))
+
+
+def make_record(offset, row, id_column, language, text, result, timestamp_column=None, text_column=None):
+    record = {
+        "row": offset,
+        "id": row.get(id_column) if id_column else None,
+        "language": language,
+        # Feedback as submitted; `text` is what was scored (translated when not in English)
+        "original_text": (row.get(text_column) or "") if text_column else text,
+        "text": text,
+        "result": result.to_dict() if isinstance(result, AdorescoreResult) else result,
+    }
+    if timestamp_column:
+        # Lets aggregates.py bucket results by when the feedback was given
+        record["timestamp"] = row.get(timestamp_column)
+    return record
+
+
+def score_file(input_path, output_path, scorer, text_column="feedback", id_column=None, timestamp_column=None,
+               input_format=None, output_format="jsonl", chunk_size=256, resume=False, start_offset=0,
+               log=sys.stderr, on_chunk=None):
+    """Streams input rows through `scorer` chunk by chunk, writing and checkpointing after each chunk.
+
+    A scorer with submit()/max_in_flight (parallel.ParallelScorer) gets that many chunks queued
+    ahead, so workers keep scoring while finished chunks are written; chunks are written in order.
+    on_chunk(records, next_offset) runs after each checkpoint (e.g. progress reporting);
+    an exception raised there stops the run with everything so far safely written.
+    """
+    checkpoint = load_checkpoint(output_path) if resume else None
+    start = max(start_offset, checkpoint["offset"] if checkpoint else 0)
+    resume_bytes = checkpoint["bytes"] if checkpoint else None
+
+    writer_cls = ParquetWriter if output_format == "parquet" else JsonlWriter
+    writer = writer_cls(output_path, resume_bytes=resume_bytes)
+
+    submit = getattr(scorer, "submit", None)
+    max_in_flight = getattr(scorer, "max_in_flight", 1) if submit is not None else 1
+    in_flight = deque()
+
+    processed = 0
+    started = time.perf_counter()
+    if start:
+        print(f"Resuming from row {start}", file=log)
+
+    def finish(chunk, pending):
+        nonlocal processed
+        scored = iter(pending.get() if submit is not None else pending)
+
+        records = []
+        for offset, row in chunk:
+            if (row.get(text_column) or "").strip():
+                language, text, result = next(scored)
+                records.append(make_record(
+                    offset, row, id_column, language, text, result, timestamp_column, text_column
+                ))
+            else:
+                records.append(make_record(
+                    offset, row, id_column, None, "", {"error": "Empty feedback."}, timestamp_column, text_column
+                ))
+
+        writer.write(records)
+        next_offset = chunk[-1][0] + 1
+        save_checkpoint(output_path, next_offset, writer.position())
+
+        processed += len(chunk)
+        elapsed = time.perf_counter() - started
+        print(f"rows={next_offset} processed={processed} rows/sec={processed / elapsed:.1f}", file=log)
+        if on_chunk is not None:
+            on_chunk(records, next_offset)
+
+    try:
+        for chunk in chunked(read_rows(input_path, input_format, start), chunk_size):
+            texts = [row[text_column] for _, row in chunk if (row.get(text_column) or "").strip()]
+            in_flight.append((chunk, submit(texts) if submit is not None else scorer(texts)))
+            if len(in_flight) >= max_in_flight:
+                finish(*in_flight.popleft())
+        while in_flight:
+            finish(*in_flight.popleft())
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - started
+    return {"processed": processed, "seconds": round(elapsed, 3),
+            "rows_per_sec": round(processed / elapsed, 2) if elapsed else 0.0}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Score a CSV/JSONL feedback file with emotions, topics & Adorescore.")
+    parser.add_argument("input", help="CSV or JSONL file with one feedback per row")
+    parser.add_argument("-o", "--output", required=True, help="JSONL file, or directory for Parquet parts")
+    parser.add_argument("--text-column", default="feedback", help="Column/field holding the feedback text")
+    parser.add_argument("--id-column", default=None, help="Optional column/field copied into each result")
+    parser.add_argument("--timestamp-column", default=None,
+                        help="Optional date/time column copied as `timestamp` (used by aggregates.py for trends)")
+    parser.add_argument("--input-format", choices=["csv", "jsonl"], default=None, help="Defaults to the file extension")
+    parser.add_argument("--output-format", choices=["jsonl", "parquet"], default="jsonl")
+    parser.add_argument("--chunk-size", type=int, default=256, help="Rows per checkpointed chunk (with --workers, 2 x workers chunks are in flight)")
+    parser.add_argument("--batch-size", type=int, default=32, help="Model batch size within a chunk")
+    parser.add_argument("--resume", action="store_true", help="Continue after the last checkpointed row")
+    parser.add_argument("--start-offset", type=int, default=0, help="Skip this many input rows")
+    parser.add_argument("--no-translate", action="store_true", help="Skip language detection & translation")
+    parser.add_argument("--translation-backend", choices=["googletrans", "stub"], default="googletrans",
+                        help="stub leaves text untranslated (offline testing)")
+    parser.add_argument("--profile", metavar="PATH", default=None,
+                        help="Record stage timings and write a cProfile capture to PATH")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes, each with its own models")
+    parser.add_argument("--torch-threads", type=int, default=None, help="Torch threads per worker (default: cores / workers)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    chunk_size = args.chunk_size
+
+    if args.workers > 1:
+        from parallel import ParallelScorer
+        scorer = ParallelScorer(
+            workers=args.workers,
+            torch_threads=args.torch_threads,
+            translate=not args.no_translate,
+            batch_size=args.batch_size,
+            translation_backend=args.translation_backend
+        )
+        # Each chunk is one task on one worker; several batches per task keep dispatch overhead low
+        chunk_size = max(chunk_size, args.batch_size * 4)
+    else:
+        scorer = ChunkScorer(
+            translate=not args.no_translate,
+            batch_size=args.batch_size,
+            translation_backend=args.translation_backend
+        )
+
+    profile = contextlib.nullcontext()
+    if args.profile:
+        instrumentation.enable()
+        profile = instrumentation.capture_profile(args.profile)
+
+    try:
+        with profile:
+            summary = score_file(
+                args.input, args.output, scorer,
+                text_column=args.text_column,
+                id_column=args.id_column,
+                timestamp_column=args.timestamp_column,
+                input_format=args.input_format,
+                output_format=args.output_format,
+                chunk_size=chunk_size,
+                resume=args.resume,
+                start_offset=args.start_offset,
+            )
+    finally:
+        if hasattr(scorer, "close"):
+            scorer.close()
+    if instrumentation.enabled():
+        # Worker processes keep their own counters, so with --workers this only covers the parent
+        summary["stages"] = instrumentation.snapshot()
+    print(json.dumps(summary), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
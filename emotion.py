@@ -1,77 +1,218 @@
-import spacy
-import json
-from transformers import pipeline
+import numpy as np
+import instrumentation
+import models
+import result_cache
+from results import (
+    ACTIVATION_LEVELS, EMOTION_ACTIVATION, EMOTION_INDEX, EMOTION_LABELS, UNKNOWN_ACTIVATION,
+    EmotionResult, EmotionScore, SentenceEmotion
+)
 
 class EmotionAnalyzer:
-    def __init__(self):
-        # Load SpaCy model (optional, for future topic extraction)
-        self.nlp = spacy.load("en_core_web_sm")
+    def __init__(self, model_name=models.EMOTION_MODEL_NAME, cache=None, backend=None, chunked="auto", max_tokens=512):
+        # Pretrained Emotion Model, loaded once per process and shared via the registry
+        # backend: "pytorch" (default), "quantized" or "onnx"; see models.default_emotion_backend
+        self.model_name = model_name
+        self.backend = backend or models.default_emotion_backend()
+        self.emotion_model = models.get_emotion_pipeline(model_name, backend=self.backend)
         
-        # Load Pretrained Emotion Model
-        self.emotion_model = pipeline("text-classification", model="monologg/bert-base-cased-goemotions-original", top_k=None)
+        # Long-form handling: "auto" scores sentence by sentence only when the text exceeds
+        # max_tokens (BERT's limit), True always does, False never does
+        self.chunked = chunked
+        self.max_tokens = max_tokens
+        
+        # Result cache (shared per process by default, cache=False disables it)
+        self.cache = result_cache.resolve_cache(cache, "emotion", EmotionResult)
         
         # Define emotion to activation mapping
-        self.emotion_activation_mapping = {
-            "anger": "High", "excitement": "High", "grief": "High", "surprise": "High", "amusement": "High",
-            "annoyance": "Medium", "disgust": "Medium", "disappointment": "Medium", "disapproval": "Medium",
-            "sadness": "Medium", "fear": "Medium", "remorse": "Medium", "desire": "Medium", "pride": "Medium",
-            "joy": "Medium", "realization": "Medium", "confusion": "Medium", "embarrassment": "Medium", "nervousness": "Medium",
-            "admiration": "Low", "caring": "Low", "optimism": "Low", "love": "Low", "curiosity": "Low",
-            "gratitude": "Low", "approval": "Low", "relief": "Low", "neutral": "Low"
-        }
+        self.emotion_activation_mapping = EMOTION_ACTIVATION
     
     def map_emotion_to_activation(self, emotion):
-        return self.emotion_activation_mapping.get(emotion.lower(), "Unknown")
+        return self.emotion_activation_mapping.get(emotion.lower(), UNKNOWN_ACTIVATION)
     
-    def analyze_feedback(self, feedback_text):
-        # Step 1: Emotion Analysis
-        emotions = self.emotion_model(feedback_text)
-        sorted_emotions = sorted(emotions[0], key=lambda x: x['score'], reverse=True)
+    def probability_vector(self, label_scores):
+        """float32 scores in EMOTION_LABELS order, or None when the model has another label set."""
+        if len(label_scores) != len(EMOTION_LABELS):
+            return None
+        probabilities = np.zeros(len(EMOTION_LABELS), dtype=np.float32)
+        for emotion_data in label_scores:
+            index = EMOTION_INDEX.get(emotion_data["label"])
+            if index is None:
+                return None
+            probabilities[index] = emotion_data["score"]
+        return probabilities
+    
+    def format_emotions(self, label_scores):
+        """Builds the emotion result from the pipeline's label/score list for one text.
+        
+        GoEmotions models keep just the probability vector (views are derived on access);
+        other label sets fall back to explicit score lists.
+        """
+        probabilities = self.probability_vector(label_scores)
+        if probabilities is not None:
+            return EmotionResult.from_probabilities(probabilities)
+        
+        sorted_emotions = sorted(label_scores, key=lambda x: x['score'], reverse=True)
+        
+        # Score every emotion once; primary/secondary & categories reuse the same objects
+        scores = [
+            EmotionScore(
+                emotion_data["label"],
+                self.map_emotion_to_activation(emotion_data["label"]),
+                round(emotion_data["score"], 6)
+            )
+            for emotion_data in sorted_emotions
+        ]
         
         # Extract primary & secondary emotions
-        primary_emotion = sorted_emotions[0]
-        secondary_emotion = sorted_emotions[1] if len(sorted_emotions) > 1 else None
-        
-        # Process emotions into required format
-        emotion_result = {
-            "emotions": {
-                "primary": {
-                    "emotion": primary_emotion["label"],
-                    "activation": self.map_emotion_to_activation(primary_emotion["label"]),
-                    "intensity": round(primary_emotion["score"], 6),
-                },
-                "secondary": {
-                    "emotion": secondary_emotion["label"],
-                    "activation": self.map_emotion_to_activation(secondary_emotion["label"]),
-                    "intensity": round(secondary_emotion["score"], 6),
-                } if secondary_emotion else None
-            }
-        }
-        
-        # Step 3: Categorize emotions by Activation Level
-        categorized_emotions = {
-            "High Activation": [],
-            "Medium Activation": [],
-            "Low Activation": []
-        }
-        
-        for emotion_data in sorted_emotions:
-            activation = self.map_emotion_to_activation(emotion_data["label"])
-            categorized_emotions[f"{activation} Activation"].append({
-                "emotion": emotion_data["label"],
-                "intensity": round(emotion_data["score"], 6)
-            })
-        
-        # Final JSON output
-        final_output = {
-            "emotion_analysis": emotion_result,
-            "categorized_emotions": categorized_emotions
-        }
-        
-        return json.dumps(final_output, indent=4)
+        primary_emotion = scores[0]
+        secondary_emotion = scores[1] if len(scores) > 1 else None
+        
+        # Step 3: Categorize emotions by Activation Level (labels we don't know go under "Unknown")
+        categorized_emotions = {level: [] for level in ACTIVATION_LEVELS}
+        for score in scores:
+            categorized_emotions.setdefault(score.activation, []).append(score)
+        
+        return EmotionResult(primary_emotion, secondary_emotion, categorized_emotions)
+    
+    @property
+    def cache_version(self):
+        return f"emotion:{self.backend}:{self.model_name}:chunked={self.chunked}:{self.max_tokens}:probabilities"
+    
+    def needs_chunking(self, texts):
+        """Which texts get sentence-level scoring under the current chunked setting."""
+        if self.chunked == "auto":
+            # Every token covers at least one character, plus [CLS]/[SEP], so only texts
+            # longer than max_tokens - 2 characters can go over the limit and need tokenizing
+            flags = [False] * len(texts)
+            candidates = [i for i, text in enumerate(texts) if len(text) > self.max_tokens - 2]
+            if candidates:
+                with instrumentation.stage("emotion.tokenize", items=len(candidates)):
+                    encoded = self.emotion_model.tokenizer([texts[i] for i in candidates])["input_ids"]
+                for i, ids in zip(candidates, encoded):
+                    flags[i] = len(ids) > self.max_tokens
+            return flags
+        return [bool(self.chunked)] * len(texts)
+    
+    def split_sentences(self, text):
+        """Sentences via the cheap rule-based sentencizer; falls back to the whole text."""
+        with instrumentation.stage("emotion.sentencize"):
+            doc = models.get_sentencizer()(text)
+        sentences = [sent.text.strip() for sent in doc.sents if sent.text.strip()]
+        return sentences or [text]
+    
+    def analyze_feedback(self, feedback_text):
+        if self.cache is not None:
+            key = result_cache.make_key(feedback_text, self.cache_version)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        if self.chunked and self.needs_chunking([feedback_text])[0]:
+            result = self.analyze_chunked([feedback_text])[0]
+        else:
+            # Step 1: Emotion Analysis
+            with instrumentation.stage("emotion.forward"):
+                emotions = self.emotion_model(feedback_text)
+            with instrumentation.stage("emotion.format"):
+                result = self.format_emotions(emotions[0])
+        
+        if self.cache is not None:
+            self.cache.put(key, result)
+        return result
+    
+    def analyze_batch(self, texts, batch_size=32):
+        """Scores many texts with padded batches; returns one result per text, in input order."""
+        return result_cache.cached_batch(
+            self.cache, texts, self.cache_version,
+            lambda misses: self._analyze_uncached_batch(misses, batch_size)
+        )
+    
+    def _analyze_uncached_batch(self, texts, batch_size):
+        if not texts:
+            return []
+        
+        # Long texts go through the sentence path together; the rest batch as whole texts
+        chunk_flags = self.needs_chunking(texts) if self.chunked else [False] * len(texts)
+        if any(chunk_flags):
+            results = [None] * len(texts)
+            long_ids = [i for i, flag in enumerate(chunk_flags) if flag]
+            short_ids = [i for i, flag in enumerate(chunk_flags) if not flag]
+            for i, result in zip(long_ids, self.analyze_chunked([texts[i] for i in long_ids], batch_size)):
+                results[i] = result
+            for i, result in zip(short_ids, self._score_whole_texts([texts[i] for i in short_ids], batch_size)):
+                results[i] = result
+            return results
+        
+        return self._score_whole_texts(texts, batch_size)
+    
+    def _score_whole_texts(self, texts, batch_size):
+        if not texts:
+            return []
+        
+        # Group similar lengths together so each batch pads as little as possible
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        with instrumentation.stage("emotion.forward", items=len(texts)):
+            batch_emotions = self.emotion_model([texts[i] for i in order], batch_size=batch_size)
+        
+        results = [None] * len(texts)
+        with instrumentation.stage("emotion.format", items=len(texts)):
+            for i, emotions in zip(order, batch_emotions):
+                results[i] = self.format_emotions(emotions)
+        return results
+    
+    def analyze_chunked(self, texts, batch_size=32):
+        """Scores each text sentence by sentence and aggregates to the usual emotion result.
+        
+        Sentences from all texts are pooled and scored in length-sorted batches, so one long
+        review doesn't pad a whole batch. Text-level scores are the length-weighted mean of
+        the sentence scores; per-sentence primary emotions are kept on `result.sentences`.
+        """
+        sentences_per_text = [self.split_sentences(text) for text in texts]
+        flat = [sentence for sentences in sentences_per_text for sentence in sentences]
+        
+        # Length-bucketed batches; truncation guards against a single sentence over the limit
+        order = sorted(range(len(flat)), key=lambda i: len(flat[i]))
+        with instrumentation.stage("emotion.forward", items=len(flat)):
+            outputs = self.emotion_model([flat[i] for i in order], batch_size=batch_size, truncation=True)
+        sentence_scores = [None] * len(flat)
+        for i, emotions in zip(order, outputs):
+            sentence_scores[i] = emotions
+        
+        results = []
+        offset = 0
+        with instrumentation.stage("emotion.format", items=len(texts)):
+            for sentences in sentences_per_text:
+                scores = sentence_scores[offset:offset + len(sentences)]
+                offset += len(sentences)
+                results.append(self._aggregate(sentences, scores))
+        return results
+    
+    def _aggregate(self, sentences, sentence_scores):
+        weights = [len(sentence) for sentence in sentences]
+        total_weight = sum(weights) or 1
+        
+        vectors = [self.probability_vector(emotions) for emotions in sentence_scores]
+        if all(vector is not None for vector in vectors):
+            mean = np.asarray(weights, dtype=np.float64) @ np.vstack(vectors).astype(np.float64) / total_weight
+            result = EmotionResult.from_probabilities(mean)
+        else:
+            totals = {}
+            for weight, emotions in zip(weights, sentence_scores):
+                for emotion_data in emotions:
+                    totals[emotion_data["label"]] = totals.get(emotion_data["label"], 0.0) + weight * emotion_data["score"]
+            result = self.format_emotions([{"label": label, "score": total / total_weight} for label, total in totals.items()])
+        
+        result.sentences = []
+        for sentence, emotions in zip(sentences, sentence_scores):
+            top = max(emotions, key=lambda x: x["score"])
+            result.sentences.append(SentenceEmotion(
+                sentence,
+                EmotionScore(top["label"], self.map_emotion_to_activation(top["label"]), round(top["score"], 6))
+            ))
+        return result
 
 # Example Usage
 if __name__ == "__main__":
     analyzer = EmotionAnalyzer()
     test_feedback = "The delivery was incredibly fast and the quality was amazing! However, one of the clothing items didn't fit well."
-    print(analyzer.analyze_feedback(test_feedback))
+    print(analyzer.analyze_feedback(test_feedback).to_json(indent=4))
@@ -0,0 +1,94 @@
+import argparse
+import json
+import time
+
+import models
+from loadtest import latency_summary
+
+SAMPLE_FEEDBACK = [
+    "The delivery was incredibly fast and the quality was amazing! However, one of the clothing items didn't fit well.",
+    "Customer service was rude and my refund took three weeks to process.",
+    "Great value for money, the fabric feels premium and the color is exactly as shown.",
+    "The package arrived damaged and nobody answered my emails.",
+    "I'm so grateful for the quick exchange, thank you!",
+    "Honestly not sure how I feel about this purchase.",
+    "Terrible. Never ordering again.",
+    "The app is easy to use but checkout keeps crashing, which is really annoying.",
+]
+
+
+def score_all(pipe, texts, batch_size):
+    """Label -> score dict per text, plus per-text latency from single-item calls."""
+    latencies = []
+    for text in texts:
+        start = time.perf_counter()
+        pipe(text)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    outputs = pipe(list(texts), batch_size=batch_size)
+    batch_seconds = time.perf_counter() - start
+
+    scores = [{item["label"]: item["score"] for item in output} for output in outputs]
+    return scores, latencies, batch_seconds
+
+
+def ranked(label_scores, k):
+    return [label for label, _ in sorted(label_scores.items(), key=lambda item: item[1], reverse=True)[:k]]
+
+
+def compare(reference, candidate):
+    """Accuracy parity of candidate scores against the PyTorch reference."""
+    diffs = [abs(ref[label] - cand.get(label, 0.0)) for ref, cand in zip(reference, candidate) for label in ref]
+    top1 = sum(ranked(ref, 1) == ranked(cand, 1) for ref, cand in zip(reference, candidate))
+    top2 = sum(ranked(ref, 2) == ranked(cand, 2) for ref, cand in zip(reference, candidate))
+    return {
+        "max_abs_diff": round(max(diffs), 6),
+        "mean_abs_diff": round(sum(diffs) / len(diffs), 6),
+        "top1_agreement": round(top1 / len(reference), 4),
+        "top2_agreement": round(top2 / len(reference), 4),
+    }
+
+
+def run(backends, texts, batch_size=16, tolerance=0.05):
+    """Scores texts with PyTorch and each backend; reports parity and latency side by side."""
+    report = {}
+    reference = None
+    for backend in ["pytorch"] + [b for b in backends if b != "pytorch"]:
+        pipe = models.get_emotion_pipeline(backend=backend)
+        pipe(texts[0])  # Warm-up so the first timed call isn't an outlier
+
+        scores, latencies, batch_seconds = score_all(pipe, texts, batch_size)
+        entry = {
+            "load_seconds": models.load_timings().get(f"emotion:{backend}:{models.EMOTION_MODEL_NAME}"),
+            "latency": latency_summary(latencies),
+            "batch_items_per_sec": round(len(texts) / batch_seconds, 2) if batch_seconds else 0.0,
+        }
+        if reference is None:
+            reference = scores
+        else:
+            entry["parity"] = compare(reference, scores)
+            entry["parity"]["within_tolerance"] = entry["parity"]["max_abs_diff"] <= tolerance
+            entry["speedup_p50"] = round(report["pytorch"]["latency"]["p50_ms"] / entry["latency"]["p50_ms"], 2)
+        report[backend] = entry
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare emotion backends against PyTorch for accuracy & latency.")
+    parser.add_argument("--backends", nargs="+", default=["quantized", "onnx"], choices=models.EMOTION_BACKENDS)
+    parser.add_argument("--input", help="Optional text file with one feedback per line")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--tolerance", type=float, default=0.05, help="Max allowed absolute score difference")
+    args = parser.parse_args(argv)
+
+    texts = SAMPLE_FEEDBACK
+    if args.input:
+        with open(args.input, encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+
+    print(json.dumps(run(args.backends, texts, args.batch_size, args.tolerance), indent=4))
+
+
+if __name__ == "__main__":
+    main()
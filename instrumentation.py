@@ -0,0 +1,174 @@
+import contextlib
+import functools
+import os
+import threading
+import time
+
+# Set CUSTOMERVOICE_PROFILE=1 to record stage timings for the whole process
+PROFILE_ENV = "CUSTOMERVOICE_PROFILE"
+
+_enabled = os.environ.get(PROFILE_ENV, "").lower() not in ("", "0", "false", "no")
+_stats = {}  # stage -> [calls, items, seconds, max_seconds]
+_lock = threading.Lock()
+_local = threading.local()  # per-thread collectors opened with collect()
+_NULL_STAGE = contextlib.nullcontext()
+
+
+def enabled():
+    return _enabled or bool(getattr(_local, "collectors", None))
+
+
+def enable(flag=True):
+    global _enabled
+    _enabled = flag
+
+
+def _record(name, items, seconds):
+    with _lock:
+        entry = _stats.get(name)
+        if entry is None:
+            entry = _stats[name] = [0, 0, 0.0, 0.0]
+        entry[0] += 1
+        entry[1] += items
+        entry[2] += seconds
+        entry[3] = max(entry[3], seconds)
+
+    for collector in getattr(_local, "collectors", ()):
+        entry = collector.setdefault(name, {"calls": 0, "items": 0, "seconds": 0.0})
+        entry["calls"] += 1
+        entry["items"] += items
+        entry["seconds"] += seconds
+
+
+class _Stage:
+    __slots__ = ("name", "items", "start")
+
+    def __init__(self, name, items):
+        self.name = name
+        self.items = items
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _record(self.name, self.items, time.perf_counter() - self.start)
+        return False
+
+
+def stage(name, items=1):
+    """Context manager timing one pipeline stage; a shared no-op when instrumentation is off."""
+    if not (_enabled or getattr(_local, "collectors", None)):
+        return _NULL_STAGE
+    return _Stage(name, items)
+
+
+def timed(name):
+    """Decorator form of stage() for whole functions (one item per call)."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not (_enabled or getattr(_local, "collectors", None)):
+                return fn(*args, **kwargs)
+            with _Stage(name, 1):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextlib.contextmanager
+def collect():
+    """Records stages run by this thread inside the block into the yielded dict (e.g. one request)."""
+    timings = {}
+    collectors = getattr(_local, "collectors", None)
+    if collectors is None:
+        collectors = _local.collectors = []
+    collectors.append(timings)
+    try:
+        yield timings
+    finally:
+        collectors.remove(timings)
+
+
+@contextlib.contextmanager
+def profiling():
+    """Turns process-wide recording on for the duration of the block."""
+    previous = _enabled
+    enable(True)
+    try:
+        yield
+    finally:
+        enable(previous)
+
+
+def snapshot():
+    """Per-stage calls, items, total and max seconds recorded so far."""
+    with _lock:
+        return {
+            name: {"calls": calls, "items": items, "seconds": round(seconds, 6), "max_seconds": round(max_seconds, 6)}
+            for name, (calls, items, seconds, max_seconds) in _stats.items()
+        }
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+def prometheus_text(prefix="customervoice"):
+    """Stage counters in the Prometheus text exposition format."""
+    metrics = [
+        ("stage_calls_total", "counter", "Number of times each pipeline stage ran.", "calls"),
+        ("stage_items_total", "counter", "Items processed by each pipeline stage.", "items"),
+        ("stage_seconds_total", "counter", "Wall time spent in each pipeline stage.", "seconds"),
+        ("stage_max_seconds", "gauge", "Slowest single call of each pipeline stage.", "max_seconds"),
+    ]
+    stats = snapshot()
+    lines = []
+    for suffix, kind, help_text, field in metrics:
+        name = f"{prefix}_{suffix}"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for stage_name, values in sorted(stats.items()):
+            lines.append(f'{name}{{stage="{stage_name}"}} {values[field]}')
+    return "\n".join(lines) + "\n"
+
+
+@contextlib.contextmanager
+def capture_profile(path=None, engine="cprofile", top=25):
+    """Profiles the block with cProfile (or pyinstrument if installed and requested).
+
+    Writes to path (.prof for cProfile, .html for pyinstrument) or prints a summary.
+    """
+    if engine == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError as e:
+            raise ImportError("engine='pyinstrument' requires `pip install pyinstrument`") from e
+
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield profiler
+        finally:
+            profiler.stop()
+            if path:
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(profiler.output_html())
+            else:
+                print(profiler.output_text())
+        return
+
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if path:
+            profiler.dump_stats(path)
+        else:
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(top)
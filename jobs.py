@@ -0,0 +1,122 @@
+import logging
+import threading
+import time
+from collections import deque
+
+import cli
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    """Raised from the chunk callback to stop a running job."""
+
+
+class ScoringJob:
+    """Scores a CSV/JSONL file with cli.score_file on a background thread.
+
+    Progress and the newest records can be read from any thread while it runs (e.g. a
+    Streamlit fragment polling it); the full results are written to output_path as JSONL.
+    """
+
+    def __init__(self, input_path, output_path, scorer, text_column="feedback", id_column=None,
+                 input_format=None, chunk_size=64, aggregate_store=None, preview_rows=500):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.scorer = scorer
+        self.text_column = text_column
+        self.id_column = id_column
+        self.input_format = input_format
+        self.chunk_size = chunk_size
+        # Optional aggregates.AggregateStore fed with every finished chunk; closed when the job ends
+        self.aggregate_store = aggregate_store
+
+        self.total = None  # counted on the job thread before scoring starts
+        self.processed = 0
+        self.status = "pending"  # pending -> running -> done | failed | cancelled
+        self.error = None
+        self.summary = None
+        self.started = None
+        self.finished = None
+
+        self._preview = deque(maxlen=preview_rows)
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="scoring-job", daemon=True)
+
+    def start(self):
+        with self._lock:
+            self.status = "running"
+            self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        """Stops after the chunk in progress; rows written so far stay in output_path."""
+        self._cancel.set()
+
+    def _on_chunk(self, records, next_offset):
+        if self.aggregate_store is not None:
+            self.aggregate_store.ingest([record["result"] for record in records],
+                                        [record.get("timestamp") for record in records])
+        with self._lock:
+            self.processed = next_offset
+            self._preview.extend(records)
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def _run(self):
+        summary, error = None, None
+        try:
+            # Counted here rather than in __init__ so a large upload doesn't block the caller;
+            # a malformed file fails the job with its parse error
+            total = sum(1 for _ in cli.read_rows(self.input_path, self.input_format))
+            with self._lock:
+                self.total = total
+            summary = cli.score_file(
+                self.input_path, self.output_path, self.scorer,
+                text_column=self.text_column,
+                id_column=self.id_column,
+                input_format=self.input_format,
+                chunk_size=self.chunk_size,
+                on_chunk=self._on_chunk
+            )
+            status = "done"
+        except JobCancelled:
+            status = "cancelled"
+        except Exception as e:
+            logger.exception("Scoring job for %s failed", self.input_path)
+            status, error = "failed", str(e)
+        finally:
+            if self.aggregate_store is not None:
+                self.aggregate_store.close()
+
+        with self._lock:
+            self.status = status
+            self.error = error
+            self.summary = summary
+            self.finished = time.perf_counter()
+
+    def progress(self):
+        """Status, rows done out of total (None while counting), completed fraction and throughput so far."""
+        with self._lock:
+            processed, status, total = self.processed, self.status, self.total
+            elapsed = ((self.finished or time.perf_counter()) - self.started) if self.started else 0.0
+        return {
+            "status": status,
+            "processed": processed,
+            "total": total,
+            "fraction": min(processed / total, 1.0) if total else (0.0 if total is None else 1.0),
+            "seconds": round(elapsed, 1),
+            "rows_per_sec": round(processed / elapsed, 1) if elapsed else 0.0,
+            "error": self.error,
+        }
+
+    def preview(self):
+        """The most recent output records, oldest first."""
+        with self._lock:
+            return list(self._preview)
+
+    def wait(self, timeout=None):
+        self._thread.join(timeout)
+        return self.status
@@ -0,0 +1,126 @@
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+SAMPLE_FEEDBACK = [
+    "The delivery was incredibly fast and the quality was amazing!",
+    "Customer service was rude and my refund took weeks.",
+    "Great value for money, the fabric feels premium.",
+    "The package arrived damaged and the size was wrong.",
+    "Easy to use app, but checkout is complicated.",
+    "La entrega fue rápida pero el color no coincide.",
+]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an unsorted list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def latency_summary(latencies):
+    """p50/p95/p99/max in milliseconds for a list of latencies in seconds."""
+    return {
+        "count": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(max(latencies, default=0) * 1000, 2),
+    }
+
+
+def post_json(url, payload, timeout):
+    data = json.dumps(payload).encode("utf-8")
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        return response.status, response.read()
+
+
+def unique_texts(count, seed=0):
+    """Distinct synthetic reviews, so no request is answered from the server's result caches."""
+    from benchmark import synthetic_corpus
+    corpus = synthetic_corpus(count, seed)
+    return [f"{item['text']} Order {i}." for i, item in enumerate(corpus)]
+
+
+def run_load_test(base_url, total_requests=200, concurrency=16, batch_size=0, timeout=60, seed=0,
+                  repeat_texts=False):
+    """Fires requests from `concurrency` threads; batch_size > 0 targets /score_batch instead of /score.
+
+    Every text is unique unless repeat_texts, which cycles SAMPLE_FEEDBACK to measure the cached path.
+    """
+    per_request = batch_size or 1
+    if repeat_texts:
+        rng = random.Random(seed)
+        texts = [rng.choice(SAMPLE_FEEDBACK) for _ in range(total_requests * per_request)]
+    else:
+        texts = unique_texts(total_requests * per_request, seed)
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def one_request(index):
+        request_texts = texts[index * per_request:(index + 1) * per_request]
+        if batch_size:
+            url = f"{base_url}/score_batch"
+            payload = {"texts": request_texts}
+        else:
+            url = f"{base_url}/score"
+            payload = {"text": request_texts[0]}
+
+        start = time.perf_counter()
+        try:
+            post_json(url, payload, timeout)
+        except Exception as e:
+            with lock:
+                errors.append(repr(e))
+            return
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one_request, range(total_requests)))
+    wall = time.perf_counter() - started
+
+    items = len(latencies) * (batch_size or 1)
+    return {
+        "endpoint": "/score_batch" if batch_size else "/score",
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "unique_texts": not repeat_texts,
+        "errors": len(errors),
+        "seconds": round(wall, 3),
+        "qps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "items_per_sec": round(items / wall, 2) if wall else 0.0,
+        "latency": latency_summary(latencies),
+        "sample_errors": errors[:5],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the scoring service and report latency percentiles & QPS.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=0, help="Texts per /score_batch call (0 = use /score)")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--repeat-texts", action="store_true",
+                        help="Cycle a few fixed texts (measures cache hits) instead of sending unique ones")
+    args = parser.parse_args(argv)
+
+    report = run_load_test(args.url, args.requests, args.concurrency, args.batch_size, args.timeout,
+                           repeat_texts=args.repeat_texts)
+    print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import os
+import threading
+import time
+
+EMOTION_MODEL_NAME = "monologg/bert-base-cased-goemotions-original"
+TOPIC_SPACY_MODEL = "en_core_web_md"
+
+# Topic keywords only need POS tags (tok2vec -> tagger -> attribute_ruler) and static vectors
+TOPIC_PIPELINE_EXCLUDE = ("parser", "ner", "lemmatizer", "senter")
+
+# Sentence embeddings for offline topic discovery (topic_discovery.py)
+SENTENCE_ENCODER_NAME = "all-MiniLM-L6-v2"
+
+# Emotion inference backends: eager PyTorch, int8 dynamic quantization, or ONNX Runtime
+EMOTION_BACKENDS = ("pytorch", "quantized", "onnx")
+EMOTION_BACKEND_ENV = "CUSTOMERVOICE_EMOTION_BACKEND"
+ONNX_EXPORT_DIR_ENV = "CUSTOMERVOICE_ONNX_DIR"
+
+# Process-wide model store: every analyzer instance shares these objects
+_models = {}
+_load_timings = {}
+_lock = threading.Lock()
+
+
+def _get_or_load(key, loader):
+    """Returns the cached model for key, loading it at most once per process."""
+    model = _models.get(key)
+    if model is not None:
+        return model
+
+    with _lock:
+        model = _models.get(key)
+        if model is None:
+            start = time.perf_counter()
+            model = loader()
+            _load_timings[key] = round(time.perf_counter() - start, 4)
+            _models[key] = model
+    return model
+
+
+def default_emotion_backend():
+    """Inference backend from CUSTOMERVOICE_EMOTION_BACKEND (pytorch, quantized or onnx)."""
+    backend = os.environ.get(EMOTION_BACKEND_ENV, "pytorch")
+    if backend not in EMOTION_BACKENDS:
+        raise ValueError(f"{EMOTION_BACKEND_ENV} must be one of {EMOTION_BACKENDS}, got {backend!r}")
+    return backend
+
+
+def _load_quantized_model(model_name):
+    """PyTorch model with every Linear layer dynamically quantized to int8."""
+    import torch
+    from transformers import AutoModelForSequenceClassification
+
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model.eval()
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _load_onnx_model(model_name):
+    """ONNX Runtime model, exported on first use and reused from CUSTOMERVOICE_ONNX_DIR (default .onnx/) afterwards."""
+    try:
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+    except ImportError as e:
+        raise ImportError("The onnx backend requires `pip install optimum[onnxruntime]`") from e
+
+    export_dir = os.path.join(os.environ.get(ONNX_EXPORT_DIR_ENV, ".onnx"), model_name.replace("/", "--"))
+    if os.path.isdir(export_dir):
+        return ORTModelForSequenceClassification.from_pretrained(export_dir)
+
+    model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+    model.save_pretrained(export_dir)
+    return model
+
+
+def get_emotion_pipeline(model_name=EMOTION_MODEL_NAME, backend=None):
+    """Shared GoEmotions text-classification pipeline (all labels, top_k=None) for the given backend."""
+    backend = backend or default_emotion_backend()
+    if backend not in EMOTION_BACKENDS:
+        raise ValueError(f"Unknown emotion backend {backend!r}, expected one of {EMOTION_BACKENDS}")
+
+    def load():
+        from transformers import AutoTokenizer, pipeline
+        if backend == "pytorch":
+            return pipeline("text-classification", model=model_name, top_k=None)
+
+        model = _load_quantized_model(model_name) if backend == "quantized" else _load_onnx_model(model_name)
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        return pipeline("text-classification", model=model, tokenizer=tokenizer, top_k=None)
+
+    return _get_or_load(f"emotion:{backend}:{model_name}", load)
+
+
+def get_spacy_model(name=TOPIC_SPACY_MODEL, exclude=()):
+    """Shared spaCy pipeline by package name, optionally without some components."""
+    exclude = tuple(sorted(exclude))
+
+    def load():
+        import spacy
+        return spacy.load(name, exclude=list(exclude))
+
+    key = f"spacy:{name}" + (f"-{','.join(exclude)}" if exclude else "")
+    return _get_or_load(key, load)
+
+
+def get_sentencizer():
+    """Rule-based sentence splitter (blank English + sentencizer); no tagger, parser or vectors."""
+    def load():
+        import spacy
+        nlp = spacy.blank("en")
+        nlp.add_pipe("sentencizer")
+        return nlp
+
+    return _get_or_load("spacy:sentencizer", load)
+
+
+def get_sentence_encoder(name=SENTENCE_ENCODER_NAME):
+    """Shared sentence-transformers encoder (only used by offline topic discovery)."""
+    def load():
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError("Topic discovery requires `pip install bertopic` (brings sentence-transformers)") from e
+        return SentenceTransformer(name)
+
+    return _get_or_load(f"sentence-encoder:{name}", load)
+
+
+def warm_up(emotion=True, topic=True):
+    """Loads the models up front (e.g. at app or worker start) and returns the load timings."""
+    if emotion:
+        get_emotion_pipeline()
+    if topic:
+        get_spacy_model(TOPIC_SPACY_MODEL, exclude=TOPIC_PIPELINE_EXCLUDE)
+    return load_timings()
+
+
+def load_timings():
+    """Seconds spent loading each model in this process, keyed by registry key."""
+    return dict(_load_timings)
+
+
+def is_loaded(key):
+    return key in _models
+
+
+def clear():
+    """Drops every cached model (mainly useful to measure cold starts)."""
+    with _lock:
+        _models.clear()
+        _load_timings.clear()
+
+
+# Example Usage
+if __name__ == "__main__":
+    import json
+    print(json.dumps(warm_up(), indent=4))
@@ -0,0 +1,110 @@
+import multiprocessing
+import os
+from collections import deque
+from itertools import islice
+
+# Per-process scorer, built once by the pool initializer
+_worker_scorer = None
+
+
+def _init_worker(torch_threads, translate, batch_size, translation_backend):
+    """Pins torch's thread counts and loads the models once per worker."""
+    global _worker_scorer
+
+    import torch
+    torch.set_num_threads(torch_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # Already fixed for this process (e.g. forked after torch started)
+
+    import models
+    from cli import ChunkScorer
+    models.warm_up()
+    _worker_scorer = ChunkScorer(translate=translate, batch_size=batch_size, translation_backend=translation_backend)
+
+
+def _score_chunk(texts):
+    return _worker_scorer(texts)
+
+
+class ParallelScorer:
+    """Shards feedback across a process pool; each worker holds its own models and returns results in order."""
+
+    def __init__(self, workers=None, torch_threads=None, translate=True, batch_size=32,
+                 translation_backend="googletrans", start_method="spawn"):
+        cpu_count = os.cpu_count() or 1
+        self.workers = workers or cpu_count
+        self.torch_threads = torch_threads or max(1, cpu_count // self.workers)
+        self.batch_size = batch_size
+        # Chunks kept queued so every worker has its next one ready while the parent does I/O
+        self.max_in_flight = self.workers * 2
+
+        # Keep workers x threads <= cores. OpenBLAS/MKL/OpenMP size their pools from these when
+        # first loaded, and a spawned child re-imports __main__ (and numpy with it) before the
+        # pool initializer runs, so they must already be in the environment the children inherit.
+        for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+            os.environ[var] = str(self.torch_threads)
+        os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+        # spawn gives every worker a clean interpreter instead of a forked copy of torch's thread pools
+        context = multiprocessing.get_context(start_method)
+        self.pool = context.Pool(
+            self.workers,
+            initializer=_init_worker,
+            initargs=(self.torch_threads, translate, batch_size, translation_backend)
+        )
+
+    def __call__(self, texts):
+        """Scores one chunk by splitting it across all workers; same output as cli.ChunkScorer."""
+        texts = list(texts)
+        if not texts:
+            return []
+        shard_size = max(1, -(-len(texts) // self.workers))
+        shards = [texts[i:i + shard_size] for i in range(0, len(texts), shard_size)]
+        return [item for shard in self.pool.map(_score_chunk, shards) for item in shard]
+
+    def submit(self, texts):
+        """Queues one chunk on a single worker; .get() on the returned AsyncResult gives its results."""
+        return self.pool.apply_async(_score_chunk, (list(texts),))
+
+    def imap(self, texts, chunk_size=None):
+        """Streams (language, text, result) tuples in input order for an arbitrarily long iterable."""
+        chunk_size = chunk_size or self.batch_size * 4
+        iterator = iter(texts)
+        chunks = iter(lambda: list(islice(iterator, chunk_size)), [])
+
+        # Pool.imap reads its whole input ahead of time; keep a bounded window in flight instead
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append(self.submit(chunk))
+            if len(in_flight) >= self.max_in_flight:
+                yield from in_flight.popleft().get()
+        while in_flight:
+            yield from in_flight.popleft().get()
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if exc[0] is not None:
+            self.pool.terminate()
+        self.close()
+
+
+# Example Usage
+if __name__ == "__main__":
+    feedback = [
+        "The delivery was incredibly fast and the quality was amazing!",
+        "Customer service was rude and the refund took weeks.",
+        "Great value for money, the fabric feels premium.",
+        "The package arrived damaged and the size was wrong.",
+    ] * 8
+
+    with ParallelScorer(workers=2) as scorer:
+        for language, text, result in scorer.imap(feedback):
+            print(f"{result.overall:8.2f}  {text}")
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+
+# Set to a file path to give every shared cache a persistent SQLite tier
+CACHE_PATH_ENV = "CUSTOMERVOICE_CACHE_PATH"
+
+
+def normalize_text(text):
+    """Canonical form used for cache keys: NFC unicode, collapsed whitespace, stripped.
+
+    Case is kept because the emotion model is cased.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def make_key(text, *versions):
+    """Content-addressed key: hash of the normalized text plus model/threshold versions."""
+    digest = hashlib.sha256()
+    for version in versions:
+        digest.update(str(version).encode("utf-8"))
+        digest.update(b"\x1f")
+    digest.update(normalize_text(text).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Bounded in-memory LRU with an optional SQLite tier that survives restarts."""
+
+    def __init__(self, namespace="default", max_entries=10000, path=None,
+                 serialize=json.dumps, deserialize=json.loads):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.serialize = serialize
+        self.deserialize = deserialize
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "writes": 0}
+
+        self._db = None
+        if path:
+            # Worker processes share one file: WAL lets readers run during a write, and the
+            # longer timeout waits out another process's commit instead of "database is locked"
+            self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            self._db.commit()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._stats["hits"] += 1
+                return self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value FROM results WHERE namespace = ? AND key = ?", (self.namespace, key)
+                ).fetchone()
+                if row is not None:
+                    value = self.deserialize(row[0])
+                    self._stats["disk_hits"] += 1
+                    self._remember(key, value)
+                    return value
+
+            self._stats["misses"] += 1
+            return default
+
+    def put(self, key, value):
+        self.put_many([(key, value)])
+
+    def put_many(self, items):
+        """Stores (key, value) pairs with a single SQLite transaction for the whole batch."""
+        items = list(items)
+        with self._lock:
+            for key, value in items:
+                self._remember(key, value)
+            self._stats["writes"] += len(items)
+            if self._db is not None and items:
+                with self._db:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO results (namespace, key, value) VALUES (?, ?, ?)",
+                        [(self.namespace, key, self.serialize(value)) for key, value in items]
+                    )
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def __contains__(self, key):
+        with self._lock:
+            if key in self._memory:
+                return True
+            if self._db is None:
+                return False
+            return self._db.execute(
+                "SELECT 1 FROM results WHERE namespace = ? AND key = ?", (self.namespace, key)
+            ).fetchone() is not None
+
+    def __len__(self):
+        return len(self._memory)
+
+    def stats(self):
+        """Hit/miss/eviction counters plus current memory size."""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["disk_hits"] + stats["misses"]
+        stats["size"] = len(self._memory)
+        stats["hit_rate"] = round((stats["hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def clear(self):
+        """Empties the memory tier and this namespace's rows on disk."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM results WHERE namespace = ?", (self.namespace,))
+                self._db.commit()
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+# Shared caches, one per namespace, reused by every analyzer in the process
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(namespace, **kwargs):
+    """Returns the process-wide cache for namespace, creating it on first use."""
+    with _caches_lock:
+        if namespace not in _caches:
+            kwargs.setdefault("path", os.environ.get(CACHE_PATH_ENV))
+            _caches[namespace] = ResultCache(namespace=namespace, **kwargs)
+        return _caches[namespace]
+
+
+def cache_stats():
+    """Stats for every shared cache, keyed by namespace."""
+    with _caches_lock:
+        caches = dict(_caches)
+    return {namespace: cache.stats() for namespace, cache in caches.items()}
+
+
+def resolve_cache(cache, namespace, result_cls):
+    """Analyzer helper: None -> shared cache for namespace, False -> no caching, else the given cache."""
+    if cache is False:
+        return None
+    if cache is None:
+        return get_cache(namespace, serialize=lambda result: result.to_json(), deserialize=result_cls.from_json)
+    return cache
+
+
+def cached_batch(cache, texts, version, compute_batch):
+    """Looks every text up in cache and runs compute_batch only on the unique misses."""
+    texts = list(texts)
+    if cache is None:
+        return compute_batch(texts)
+
+    keys = [make_key(text, version) for text in texts]
+    results = [cache.get(key) for key in keys]
+
+    # Duplicates within the batch are computed once
+    missing = {}
+    for i, (key, result) in enumerate(zip(keys, results)):
+        if result is None and key not in missing:
+            missing[key] = i
+
+    if missing:
+        computed = dict(zip(missing, compute_batch([texts[i] for i in missing.values()])))
+        cache.put_many(computed.items())
+        results = [computed[key] if result is None else result for key, result in zip(keys, results)]
+
+    return results
@@ -0,0 +1,290 @@
+import json
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+ACTIVATION_LEVELS = ("High", "Medium", "Low")
+# Activation of labels outside EMOTION_ACTIVATION (models with another label set); serialized only when used
+UNKNOWN_ACTIVATION = "Unknown"
+
+# GoEmotions labels in the model's id order; EmotionResult.probabilities follows this order
+EMOTION_LABELS = (
+    "admiration", "amusement", "anger", "annoyance", "approval", "caring", "confusion",
+    "curiosity", "desire", "disappointment", "disapproval", "disgust", "embarrassment",
+    "excitement", "fear", "gratitude", "grief", "joy", "love", "nervousness", "optimism",
+    "pride", "realization", "relief", "remorse", "sadness", "surprise", "neutral"
+)
+EMOTION_INDEX = {label: i for i, label in enumerate(EMOTION_LABELS)}
+
+EMOTION_ACTIVATION = {
+    "anger": "High", "excitement": "High", "grief": "High", "surprise": "High", "amusement": "High",
+    "annoyance": "Medium", "disgust": "Medium", "disappointment": "Medium", "disapproval": "Medium",
+    "sadness": "Medium", "fear": "Medium", "remorse": "Medium", "desire": "Medium", "pride": "Medium",
+    "joy": "Medium", "realization": "Medium", "confusion": "Medium", "embarrassment": "Medium", "nervousness": "Medium",
+    "admiration": "Low", "caring": "Low", "optimism": "Low", "love": "Low", "curiosity": "Low",
+    "gratitude": "Low", "approval": "Low", "relief": "Low", "neutral": "Low"
+}
+
+
+class Result(ABC):
+    """Base for analysis results: plain attributes in memory, serialized only at the output boundary."""
+    __slots__ = ()
+
+    @abstractmethod
+    def to_dict(self):
+        """Plain-dict form used by every export format."""
+
+    @classmethod
+    @abstractmethod
+    def from_dict(cls, data):
+        """Rebuilds a result from its to_dict form."""
+
+    def to_json(self, indent=None):
+        """Compact JSON by default; pass indent for human-readable output."""
+        separators = None if indent else (",", ":")
+        return json.dumps(self.to_dict(), indent=indent, separators=separators)
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.from_dict(json.loads(text))
+
+    def to_msgpack(self):
+        try:
+            import msgpack
+        except ImportError as e:
+            raise ImportError("msgpack export requires `pip install msgpack`") from e
+        return msgpack.packb(self.to_dict(), use_bin_type=True)
+
+    @classmethod
+    def from_msgpack(cls, data):
+        try:
+            import msgpack
+        except ImportError as e:
+            raise ImportError("msgpack import requires `pip install msgpack`") from e
+        return cls.from_dict(msgpack.unpackb(data, raw=False))
+
+    def encode(self, fmt="json"):
+        """Export in the given format ("json" or "msgpack")."""
+        if fmt == "json":
+            return self.to_json()
+        if fmt == "msgpack":
+            return self.to_msgpack()
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class EmotionScore(Result):
+    """A single emotion with its activation level and intensity."""
+    __slots__ = ("emotion", "activation", "intensity")
+
+    def __init__(self, emotion, activation, intensity):
+        self.emotion = emotion
+        self.activation = activation
+        self.intensity = intensity
+
+    def to_dict(self):
+        return {"emotion": self.emotion, "activation": self.activation, "intensity": self.intensity}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get("emotion", ""), data.get("activation", ""), data.get("intensity", 0))
+
+
+class SentenceEmotion(Result):
+    """Dominant emotion of one sentence in a chunked (long-form) analysis."""
+    __slots__ = ("text", "primary")
+
+    def __init__(self, text, primary):
+        self.text = text
+        self.primary = primary
+
+    def to_dict(self):
+        return {"text": self.text, "primary": self.primary.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get("text", ""), EmotionScore.from_dict(data.get("primary", {})))
+
+
+class EmotionResult(Result):
+    """Primary/secondary emotions plus every emotion grouped by activation level.
+
+    Results built with from_probabilities keep only the float32 vector over EMOTION_LABELS;
+    primary, secondary and categorized are derived from it on first access.
+    """
+    __slots__ = ("_primary", "_secondary", "_categorized", "probabilities", "sentences")
+
+    def __init__(self, primary, secondary, categorized, sentences=None, probabilities=None):
+        self._primary = primary
+        self._secondary = secondary
+        # {"High": [EmotionScore, ...], "Medium": [...], "Low": [...]}, each sorted by intensity
+        self._categorized = categorized
+        # float32 array aligned with EMOTION_LABELS, or None for models with another label set
+        self.probabilities = probabilities
+        # [SentenceEmotion, ...] when the text was scored sentence by sentence, else None
+        self.sentences = sentences
+
+    @classmethod
+    def from_probabilities(cls, probabilities, sentences=None):
+        return cls(None, None, None, sentences, np.asarray(probabilities, dtype=np.float32))
+
+    def _score(self, index):
+        label = EMOTION_LABELS[index]
+        return EmotionScore(label, EMOTION_ACTIVATION[label], round(float(self.probabilities[index]), 6))
+
+    def ranked(self):
+        """Label indices by descending probability; ties keep label order like the pipeline's sort."""
+        return np.argsort(-self.probabilities, kind="stable")
+
+    def _derive_top(self):
+        top = self.ranked()[:2]
+        self._primary = self._score(top[0])
+        self._secondary = self._score(top[1])
+
+    @property
+    def primary(self):
+        if self._primary is None and self.probabilities is not None:
+            self._derive_top()
+        return self._primary
+
+    @property
+    def secondary(self):
+        if self._secondary is None and self.probabilities is not None:
+            self._derive_top()
+        return self._secondary
+
+    @property
+    def categorized(self):
+        if self._categorized is None and self.probabilities is not None:
+            self._categorized = {level: [] for level in ACTIVATION_LEVELS}
+            for index in self.ranked().tolist():
+                score = self._score(index)
+                self._categorized[score.activation].append(score)
+        return self._categorized
+
+    def to_dict(self):
+        categorized = self.categorized
+        levels = ACTIVATION_LEVELS + ((UNKNOWN_ACTIVATION,) if categorized.get(UNKNOWN_ACTIVATION) else ())
+        data = {
+            "emotion_analysis": {
+                "emotions": {
+                    "primary": self.primary.to_dict(),
+                    "secondary": self.secondary.to_dict() if self.secondary else None
+                }
+            },
+            "categorized_emotions": {
+                f"{level} Activation": [
+                    {"emotion": score.emotion, "intensity": score.intensity}
+                    for score in categorized.get(level, [])
+                ]
+                for level in levels
+            }
+        }
+        if self.probabilities is not None:
+            data["probabilities"] = self.probabilities.tolist()
+        if self.sentences is not None:
+            data["sentences"] = [sentence.to_dict() for sentence in self.sentences]
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        sentences = data.get("sentences")
+        sentences = [SentenceEmotion.from_dict(item) for item in sentences] if sentences is not None else None
+        if data.get("probabilities") is not None:
+            return cls.from_probabilities(data["probabilities"], sentences)
+
+        emotions = data.get("emotion_analysis", {}).get("emotions", {})
+        secondary = emotions.get("secondary")
+        categorized_emotions = data.get("categorized_emotions", {})
+        categorized = {
+            level: [
+                EmotionScore(item["emotion"], level, item["intensity"])
+                for item in categorized_emotions.get(f"{level} Activation", [])
+            ]
+            for level in ACTIVATION_LEVELS
+        }
+        if categorized_emotions.get(f"{UNKNOWN_ACTIVATION} Activation"):
+            categorized[UNKNOWN_ACTIVATION] = [
+                EmotionScore(item["emotion"], UNKNOWN_ACTIVATION, item["intensity"])
+                for item in categorized_emotions[f"{UNKNOWN_ACTIVATION} Activation"]
+            ]
+        return cls(
+            EmotionScore.from_dict(emotions.get("primary", {})),
+            EmotionScore.from_dict(secondary) if secondary else None,
+            categorized,
+            sentences
+        )
+
+
+class TopicResult(Result):
+    """Matched main topics and the best subtopic per main topic."""
+    __slots__ = ("feedback", "main", "subtopics")
+
+    def __init__(self, feedback, main, subtopics):
+        self.feedback = feedback
+        self.main = main
+        self.subtopics = subtopics
+
+    def to_dict(self):
+        return {
+            "feedback": self.feedback,
+            "topics": {
+                "main": self.main,
+                "subtopics": self.subtopics
+            }
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        topics = data.get("topics", {})
+        return cls(data.get("feedback", ""), topics.get("main", []), topics.get("subtopics", {}))
+
+
+class AdorescoreResult(Result):
+    """Adorescore with the emotions and topics it was computed from."""
+    __slots__ = ("primary", "secondary", "main", "subtopics", "overall", "breakdown")
+
+    def __init__(self, primary, secondary, main, subtopics, overall, breakdown):
+        self.primary = primary
+        self.secondary = secondary
+        self.main = main
+        self.subtopics = subtopics
+        self.overall = overall
+        self.breakdown = breakdown
+
+    def to_dict(self):
+        empty = {"emotion": "", "activation": "", "intensity": 0}
+        return {
+            "emotions": {
+                "primary": self.primary.to_dict() if self.primary else empty,
+                "secondary": self.secondary.to_dict() if self.secondary else empty
+            },
+            "topics": {
+                "main": self.main,
+                "subtopics": self.subtopics
+            },
+            "adorescore": {
+                "overall": self.overall,
+                "breakdown": self.breakdown
+            }
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        emotions = data.get("emotions", {})
+        topics = data.get("topics", {})
+        adorescore = data.get("adorescore", {})
+        secondary = emotions.get("secondary")
+        return cls(
+            EmotionScore.from_dict(emotions.get("primary", {})),
+            EmotionScore.from_dict(secondary) if secondary and secondary.get("emotion") else None,
+            topics.get("main", []),
+            topics.get("subtopics", {}),
+            adorescore.get("overall", 0),
+            adorescore.get("breakdown", {})
+        )
@@ -0,0 +1,190 @@
+import argparse
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from flask import Flask, Response, jsonify, request
+
+import instrumentation
+import models
+import result_cache
+from results import AdorescoreResult
+
+
+class MicroBatcher:
+    """Collects concurrent requests into one model batch, bounded by size and a max-wait deadline."""
+
+    def __init__(self, process_batch, max_batch_size=32, max_wait_ms=10):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.stats = {"batches": 0, "items": 0, "errors": 0, "retried_batches": 0}
+
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, item):
+        """Queues one item and returns a Future for its result."""
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def submit_many(self, items):
+        return [self.submit(item) for item in items]
+
+    def _next_batch(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                entry = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if entry is None:
+                self._queue.put(None)  # Let the loop see the shutdown after this batch
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+
+            items = [item for item, _ in batch]
+            try:
+                results = self.process_batch(items)
+            except Exception as e:
+                if len(batch) == 1:
+                    self.stats["errors"] += 1
+                    batch[0][1].set_exception(e)
+                else:
+                    # One bad input shouldn't fail its neighbours: rerun the items one by one
+                    self.stats["retried_batches"] += 1
+                    self._run_individually(batch)
+                continue
+
+            self.stats["batches"] += 1
+            self.stats["items"] += len(batch)
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def _run_individually(self, batch):
+        """Scores each entry as its own batch; only the items that raise get the exception."""
+        for item, future in batch:
+            try:
+                result = self.process_batch([item])[0]
+            except Exception as e:
+                self.stats["errors"] += 1
+                future.set_exception(e)
+                continue
+            self.stats["batches"] += 1
+            self.stats["items"] += 1
+            future.set_result(result)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+
+def to_response(language, text, result):
+    return {
+        "language": language,
+        "text": text,
+        "result": result.to_dict() if isinstance(result, AdorescoreResult) else result,
+    }
+
+
+def create_app(max_batch_size=32, max_wait_ms=10, translate=True, request_timeout=60, cache=True):
+    """Builds the Flask app with warm models and a shared micro-batcher.
+
+    cache=False turns off the emotion, topic and translation result caches so every request
+    runs the models (what load tests of batched inference should measure).
+    """
+    from adorescore import AdorescoreCalculator
+    from cli import ChunkScorer
+    from emotion import EmotionAnalyzer
+    from topic import TopicAnalyzer
+
+    models.warm_up()
+    calculator = None if cache else AdorescoreCalculator(
+        emotion_analyzer=EmotionAnalyzer(cache=False), topic_analyzer=TopicAnalyzer(cache=False)
+    )
+    scorer = ChunkScorer(calculator=calculator, translate=translate, batch_size=max_batch_size,
+                         translation_cache=None if cache else False)
+    batcher = MicroBatcher(scorer, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+
+    app = Flask(__name__)
+    app.config["batcher"] = batcher
+
+    @app.post("/score")
+    def score():
+        payload = request.get_json(silent=True) or {}
+        text = payload.get("text")
+        if not isinstance(text, str) or not text.strip():
+            return jsonify({"error": "Request body must be JSON with a non-empty 'text' field."}), 400
+
+        language, translated, result = batcher.submit(text).result(timeout=request_timeout)
+        return jsonify(to_response(language, translated, result))
+
+    @app.post("/score_batch")
+    def score_batch():
+        payload = request.get_json(silent=True) or {}
+        texts = payload.get("texts")
+        if not isinstance(texts, list) or not all(isinstance(text, str) and text.strip() for text in texts):
+            return jsonify({"error": "Request body must be JSON with a 'texts' list of non-empty strings."}), 400
+
+        # Items join the shared queue, so they batch together with concurrent /score calls
+        futures = batcher.submit_many(texts)
+        return jsonify({"results": [to_response(*future.result(timeout=request_timeout)) for future in futures]})
+
+    @app.errorhandler(FutureTimeoutError)
+    def timed_out(e):
+        return jsonify({"error": "Scoring timed out."}), 504
+
+    @app.get("/metrics")
+    def metrics():
+        # Stage timings are only recorded with CUSTOMERVOICE_PROFILE=1
+        return Response(instrumentation.prometheus_text(), mimetype="text/plain; version=0.0.4")
+
+    @app.get("/health")
+    def health():
+        return jsonify({
+            "status": "ok",
+            "load_timings": models.load_timings(),
+            "batcher": batcher.stats,
+            "cache": result_cache.cache_stats(),
+        })
+
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP scoring service for emotions, topics & Adorescore.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=10, help="Longest a request waits for its batch to fill")
+    parser.add_argument("--no-translate", action="store_true")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Disable the emotion/topic/translation result caches (for load testing inference)")
+    args = parser.parse_args(argv)
+
+    app = create_app(max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms,
+                     translate=not args.no_translate, cache=not args.no_cache)
+    # threaded=True: each request thread just waits on its Future while the batcher runs the models
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
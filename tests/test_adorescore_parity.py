@@ -0,0 +1,95 @@
+"""The columnar Adorescore path must give bit-for-bit the same numbers as the per-item scorer."""
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from adorescore import AdorescoreCalculator, ScoreColumns, _round4  # noqa: E402
+from results import ACTIVATION_LEVELS, EMOTION_ACTIVATION, EMOTION_LABELS, EmotionResult, EmotionScore, TopicResult  # noqa: E402
+
+# Known topics plus ones without a configured weight (e.g. from topic_discovery.py)
+TOPICS = ["Delivery", "Quality", "Clothes", "Customer Service", "Pricing", "Usability",
+          "Experience", "Packaging", "Returns", "Sizing", "Checkout"]
+ROWS = 5000
+
+
+def calculator(mode="top2"):
+    # Scoring never touches the analyzers, so no models are loaded
+    return AdorescoreCalculator(emotion_analyzer=object(), topic_analyzer=object(), mode=mode)
+
+
+def random_emotion_result(rng):
+    kind = rng.random()
+    if kind < 0.6:
+        probabilities = np.asarray([rng.random() ** 4 for _ in EMOTION_LABELS], dtype=np.float32)
+        if rng.random() < 0.1:
+            probabilities[rng.randrange(len(EMOTION_LABELS))] = probabilities.max()  # tie for the top spot
+        return EmotionResult.from_probabilities(probabilities / probabilities.sum())
+
+    # Explicit scores as built for models with another label set; sometimes no secondary
+    labels = rng.sample(EMOTION_LABELS, 2)
+    intensities = sorted((round(rng.random(), 6) for _ in labels), reverse=True)
+    scores = [EmotionScore(label, EMOTION_ACTIVATION[label], intensity) for label, intensity in zip(labels, intensities)]
+    secondary = scores[1] if kind < 0.9 else None
+    categorized = {level: [score for score in scores if score.activation == level] for level in ACTIVATION_LEVELS}
+    return EmotionResult(scores[0], secondary, categorized)
+
+
+def random_topic_result(rng):
+    main = rng.sample(TOPICS, rng.choice([0, 1, 1, 2, 2, 3, 4]))  # random order within a row
+    return TopicResult("", main, {topic: [] for topic in main})
+
+
+def random_results(seed):
+    rng = random.Random(seed)
+    return ([random_emotion_result(rng) for _ in range(ROWS)],
+            [random_topic_result(rng) for _ in range(ROWS)])
+
+
+@pytest.mark.parametrize("mode", ["top2", "distribution"])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_score_columns_matches_score_results(mode, seed):
+    scorer = calculator(mode)
+    emotion_results, topic_results = random_results(seed)
+
+    columns = ScoreColumns.from_results(emotion_results, topic_results)
+    overall, breakdown = scorer.score_columns(columns)
+    breakdowns = columns.breakdown_dicts(breakdown)
+
+    for i, (emotion_result, topic_result) in enumerate(zip(emotion_results, topic_results)):
+        expected = scorer.score_results(emotion_result, topic_result)
+        assert float(overall[i]) == expected.overall, i
+        # Same keys in the same order, same values
+        assert list(breakdowns[i].items()) == list(expected.breakdown.items()), i
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_reweight_matches_compute_topic_breakdown(seed):
+    rng = random.Random(seed)
+    scorer = calculator()
+    emotion_results, topic_results = random_results(seed)
+    stored = [scorer.score_results(e, t) for e, t in zip(emotion_results, topic_results)]
+    weights = {topic: round(rng.random(), 2) for topic in TOPICS[:-1]}  # "Checkout" keeps the default
+
+    reweighted = scorer.reweight(stored + [result.to_dict() for result in stored] + [{"error": "Empty feedback."}], weights)
+
+    reference = calculator()
+    reference.topic_weights = weights
+    for i, result in enumerate(stored):
+        expected = reference.compute_topic_breakdown(result.overall, result.main)
+        assert list(reweighted[i].breakdown.items()) == list(expected.items()), i
+        assert reweighted[i].overall == result.overall
+        as_dict = reweighted[len(stored) + i]["adorescore"]
+        assert list(as_dict["breakdown"].items()) == list(expected.items()), i
+    assert reweighted[-1] == {"error": "Empty feedback."}
+
+
+def test_round4_matches_round_on_ties():
+    rng = random.Random(0)
+    # Exact .5 ties at the 4th decimal plus their float neighbours, and plain random values
+    values = [k / 1e4 + 0.00005 for k in range(-20000, 20000)]
+    values += [float(np.nextafter(v, direction)) for v in values[::50] for direction in (-np.inf, np.inf)]
+    values += [rng.uniform(-100, 100) for _ in range(20000)]
+
+    assert _round4(values).tolist() == [round(value, 4) for value in values]
@@ -0,0 +1,95 @@
+"""AggregateStore rollups: batched merges must equal the statistics of everything ingested."""
+import random
+import statistics
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import aggregates  # noqa: E402
+from results import AdorescoreResult, EmotionScore  # noqa: E402
+
+TOPICS = ["Delivery", "Quality", "Pricing"]
+
+
+def random_result(rng):
+    main = rng.sample(TOPICS, rng.randint(0, 2))
+    return AdorescoreResult(
+        EmotionScore(rng.choice(["joy", "anger"]), "Medium", 0.5), None,
+        main, {topic: ["Fast Delivery"] for topic in main[:1]},
+        round(rng.uniform(-100, 100), 4), {}
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = aggregates.AggregateStore(str(tmp_path / "aggregates.db"))
+    yield store
+    store.close()
+
+
+def test_batched_ingest_matches_whole_dataset_statistics(store):
+    rng = random.Random(0)
+    results = [random_result(rng) for _ in range(1000)]
+    timestamps = [f"2024-01-0{1 + i % 3}T12:00:00Z" for i in range(len(results))]
+
+    # Uneven batches, some dicts, merged one after another
+    for start, end in ((0, 1), (1, 250), (250, 600), (600, 1000)):
+        batch = [result.to_dict() if i % 2 else result for i, result in enumerate(results[start:end])]
+        assert store.ingest(batch, timestamps[start:end]) == end - start
+
+    overall = [result.overall for result in results]
+    summary = store.summary()
+    assert summary["count"] == len(results)
+    assert summary["mean"] == round(statistics.fmean(overall), 4)
+    assert summary["variance"] == round(statistics.variance(overall), 4)
+
+    delivery = [result.overall for result in results if "Delivery" in result.main]
+    assert store.summary("topic", "Delivery")["variance"] == round(statistics.variance(delivery), 4)
+
+    day = [result.overall for result, timestamp in zip(results, timestamps) if timestamp.startswith("2024-01-02")]
+    assert store.summary(bucket="2024-01-02")["mean"] == round(statistics.fmean(day), 4)
+    assert [row["bucket"] for row in store.trend()] == ["2024-01-01", "2024-01-02", "2024-01-03"]
+
+    emotions = store.emotion_histogram()
+    assert sum(emotions.values()) == len(results)
+    assert store.top_themes(limit=1)[0]["count"] == max(
+        sum(topic in result.main for result in results) for topic in TOPICS
+    )
+
+
+def test_error_records_are_skipped(store):
+    assert store.ingest([{"error": "Empty feedback."}], [None]) == 0
+    assert store.summary() is None
+
+
+@pytest.mark.parametrize("timestamp, bucket", [
+    ("2024-01-02T09:30:00Z", "2024-01-02"),
+    ("2024-01-02T09:30:00+05:00", "2024-01-02"),
+    (1704186000, "2024-01-02"),
+    ("1704186000", "2024-01-02"),  # epoch seconds read from a CSV cell
+    (" 1704186000.5 ", "2024-01-02"),
+    ("01/02/2024", aggregates.UNKNOWN),
+    ("Jan 2 2024", aggregates.UNKNOWN),
+    ("1e30", aggregates.UNKNOWN),
+])
+def test_time_bucket(timestamp, bucket):
+    assert aggregates.time_bucket(timestamp) == bucket
+
+
+def test_time_bucket_granularities():
+    assert aggregates.time_bucket("2024-01-02T09:30:00Z", "hour") == "2024-01-02T09"
+    assert aggregates.time_bucket("2024-01-02T09:30:00Z", "week") == "2024-W01"
+    assert aggregates.time_bucket("2024-01-02T09:30:00Z", "month") == "2024-01"
+    with pytest.raises(ValueError):
+        aggregates.time_bucket("2024-01-02", "year")
+
+
+def test_unparseable_timestamps_are_counted_but_left_out_of_trends(store):
+    rng = random.Random(1)
+    results = [random_result(rng) for _ in range(3)]
+    store.ingest(results, ["2024-01-02", "not a date", "01/02/2024"])
+
+    assert store.summary()["count"] == 3
+    assert store.summary(bucket=aggregates.UNKNOWN)["count"] == 2
+    assert [row["bucket"] for row in store.trend()] == ["2024-01-02"]
@@ -0,0 +1,129 @@
+"""score_file streaming, checkpointing and crash/resume with a fake scorer (no models)."""
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import cli  # noqa: E402
+
+
+def fake_scorer(texts):
+    return [("es", text.upper(), {"adorescore": {"overall": len(text)}}) for text in texts]
+
+
+class CrashAfter:
+    """Scorer that raises on its n-th call, like a process killed mid-run."""
+
+    def __init__(self, calls):
+        self.calls = calls
+
+    def __call__(self, texts):
+        self.calls -= 1
+        if self.calls < 0:
+            raise RuntimeError("crashed")
+        return fake_scorer(texts)
+
+
+class AsyncScorer:
+    """submit()/max_in_flight scorer like parallel.ParallelScorer, backed by threads."""
+    max_in_flight = 4
+
+    def __init__(self):
+        self.pool = ThreadPoolExecutor(3)
+
+    def submit(self, texts):
+        future = self.pool.submit(fake_scorer, list(texts))
+        future.get = future.result
+        return future
+
+
+@pytest.fixture
+def feedback_csv(tmp_path):
+    path = tmp_path / "feedback.csv"
+    rows = ["id,feedback"] + [f"{i},hola {i}" if i % 7 else f"{i}," for i in range(100)]
+    path.write_text("\n".join(rows) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def score(input_path, output_path, scorer, **kwargs):
+    return cli.score_file(input_path, output_path, scorer, id_column="id", chunk_size=16, log=io.StringIO(), **kwargs)
+
+
+def test_records_keep_order_original_text_and_empty_rows(feedback_csv, tmp_path):
+    output = str(tmp_path / "out.jsonl")
+    assert score(feedback_csv, output, fake_scorer)["processed"] == 100
+
+    records = read_jsonl(output)
+    assert [record["row"] for record in records] == list(range(100))
+    assert records[1]["original_text"] == "hola 1" and records[1]["text"] == "HOLA 1"
+    assert records[0]["result"] == {"error": "Empty feedback."}
+    assert cli.load_checkpoint(output)["offset"] == 100
+
+
+def test_resume_after_crash_matches_an_uninterrupted_run(feedback_csv, tmp_path):
+    expected = str(tmp_path / "expected.jsonl")
+    score(feedback_csv, expected, fake_scorer)
+
+    output = str(tmp_path / "out.jsonl")
+    with pytest.raises(RuntimeError):
+        score(feedback_csv, output, CrashAfter(3))
+    assert cli.load_checkpoint(output)["offset"] == 48
+    # A half-written chunk after the checkpoint is dropped on resume
+    with open(output, "a", encoding="utf-8") as f:
+        f.write('{"row": 48, "partial"')
+
+    score(feedback_csv, output, fake_scorer, resume=True)
+    with open(output, "rb") as got, open(expected, "rb") as want:
+        assert got.read() == want.read()
+
+
+def test_resume_refuses_a_truncated_output(feedback_csv, tmp_path):
+    output = str(tmp_path / "out.jsonl")
+    with pytest.raises(RuntimeError):
+        score(feedback_csv, output, CrashAfter(2))
+    with open(output, "r+b") as f:
+        f.truncate(10)
+
+    with pytest.raises(ValueError, match="Cannot resume"):
+        score(feedback_csv, output, fake_scorer, resume=True)
+    with open(output, "rb") as f:
+        assert b"\x00" not in f.read()
+
+
+def test_pipelined_scorer_writes_the_same_output(feedback_csv, tmp_path):
+    sequential, pipelined = str(tmp_path / "sequential.jsonl"), str(tmp_path / "pipelined.jsonl")
+    score(feedback_csv, sequential, fake_scorer)
+    score(feedback_csv, pipelined, AsyncScorer())
+
+    with open(sequential, "rb") as a, open(pipelined, "rb") as b:
+        assert a.read() == b.read()
+
+
+def test_on_chunk_exception_stops_with_progress_saved(feedback_csv, tmp_path):
+    output = str(tmp_path / "out.jsonl")
+    seen = []
+
+    def on_chunk(records, next_offset):
+        seen.append(next_offset)
+        if next_offset >= 32:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        score(feedback_csv, output, fake_scorer, on_chunk=on_chunk)
+    assert seen == [16, 32]
+    assert len(read_jsonl(output)) == 32 == cli.load_checkpoint(output)["offset"]
+
+
+def test_invalid_jsonl_names_the_line(tmp_path):
+    path = tmp_path / "feedback.jsonl"
+    path.write_text('{"feedback": "ok"}\n\n{oops\n', encoding="utf-8")
+    with pytest.raises(ValueError, match="line 3"):
+        list(cli.read_rows(str(path)))
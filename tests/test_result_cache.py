@@ -0,0 +1,54 @@
+"""ResultCache tiers and cached_batch deduplication."""
+import result_cache
+
+
+def test_keys_normalize_whitespace_and_unicode_but_not_case():
+    assert result_cache.make_key("  Café  is\tgood ", "v1") == result_cache.make_key("Café is good", "v1")
+    assert result_cache.make_key("good", "v1") != result_cache.make_key("Good", "v1")
+    assert result_cache.make_key("good", "v1") != result_cache.make_key("good", "v2")
+
+
+def test_lru_evicts_least_recently_used():
+    cache = result_cache.ResultCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the oldest
+    cache.put("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_sqlite_tier_survives_a_new_instance(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = result_cache.ResultCache("emotion", path=path)
+    cache.put_many([("a", {"score": 1}), ("b", {"score": 2})])
+    cache.close()
+
+    reopened = result_cache.ResultCache("emotion", path=path)
+    assert reopened.get("a") == {"score": 1}
+    assert reopened.stats()["disk_hits"] == 1
+    # Namespaces share the file without seeing each other's rows
+    assert result_cache.ResultCache("topic", path=path).get("a") is None
+    assert reopened._db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    reopened.clear()
+    assert result_cache.ResultCache("emotion", path=path).get("b") is None
+
+
+def test_cached_batch_computes_each_unique_miss_once(tmp_path):
+    cache = result_cache.ResultCache(path=str(tmp_path / "cache.db"))
+    calls = []
+
+    def compute(texts):
+        calls.append(list(texts))
+        return [text.upper() for text in texts]
+
+    assert result_cache.cached_batch(cache, ["a", "b", "a", " a "], "v1", compute) == ["A", "B", "A", "A"]
+    assert result_cache.cached_batch(cache, ["b", "c"], "v1", compute) == ["B", "C"]
+    assert calls == [["a", "b"], ["c"]]
+
+
+def test_cached_batch_without_cache_computes_everything():
+    assert result_cache.cached_batch(None, ["a", "a"], "v1", lambda texts: [len(texts)] * len(texts)) == [2, 2]
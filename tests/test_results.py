@@ -0,0 +1,32 @@
+"""Result serialization round-trips."""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from results import ACTIVATION_LEVELS, EMOTION_LABELS, EmotionResult, EmotionScore  # noqa: E402
+
+
+def test_probability_result_round_trips():
+    probabilities = np.linspace(0.01, 0.5, len(EMOTION_LABELS), dtype=np.float32)
+    result = EmotionResult.from_probabilities(probabilities / probabilities.sum())
+
+    data = result.to_dict()
+    assert "Unknown Activation" not in data["categorized_emotions"]
+    assert EmotionResult.from_json(result.to_json()) == result
+
+
+def test_labels_outside_goemotions_round_trip_under_unknown():
+    # e.g. a positive/negative sentiment model
+    positive = EmotionScore("positive", "Unknown", 0.8)
+    negative = EmotionScore("negative", "Unknown", 0.2)
+    categorized = {level: [] for level in ACTIVATION_LEVELS}
+    categorized["Unknown"] = [positive, negative]
+    result = EmotionResult(positive, negative, categorized)
+
+    data = result.to_dict()
+    assert data["categorized_emotions"]["Unknown Activation"] == [
+        {"emotion": "positive", "intensity": 0.8}, {"emotion": "negative", "intensity": 0.2}
+    ]
+    restored = EmotionResult.from_dict(data)
+    assert restored == result
+    assert restored.categorized["Unknown"] == [positive, negative]
@@ -0,0 +1,50 @@
+"""TranslationStage grouping, caching and fallbacks, offline through StubBackend."""
+import result_cache
+import translation
+
+
+class FailingBackend(translation.TranslationBackend):
+    name = "failing"
+
+    def translate_batch(self, texts, src, dest):
+        raise ConnectionError("offline")
+
+
+def stage(backend, **kwargs):
+    return translation.TranslationStage(backend=backend, cache=result_cache.ResultCache("translation"), **kwargs)
+
+
+def test_groups_by_confident_source_language():
+    backend = translation.StubBackend({"hola": "hello", "bonjour": "hello", "gracias": "thanks"})
+    texts = ["hola", "fine", "bonjour", "gracias", "???"]
+
+    translated = stage(backend).translate_batch(
+        texts, ["es", "en", "fr", "es", "unknown"], [0.99, 0.99, 0.95, 0.5, 0.0]
+    )
+
+    assert translated == ["hello", "fine", "hello", "thanks", "???"]
+    # Target-language text isn't sent; low-confidence and undetectable text lets the backend detect
+    assert backend.calls == [("es", "en", ["hola"]), ("fr", "en", ["bonjour"]), ("auto", "en", ["gracias", "???"])]
+
+
+def test_languages_without_confidences_are_trusted():
+    backend = translation.StubBackend()
+    stage(backend).translate_batch(["ciao"], ["it"])
+    assert backend.calls == [("it", "en", ["ciao"])]
+
+
+def test_cached_and_duplicate_texts_are_translated_once():
+    backend = translation.StubBackend({"hola": "hello"})
+    translation_stage = stage(backend, batch_size=2)
+
+    assert translation_stage.translate_batch(["hola", "hola"], ["es", "es"]) == ["hello", "hello"]
+    assert translation_stage.translate_batch(["hola"], ["es"]) == ["hello"]
+    assert backend.calls == [("es", "en", ["hola"])]
+
+
+def test_failed_translation_keeps_the_original_and_is_not_cached():
+    translation_stage = stage(FailingBackend())
+
+    assert translation_stage.translate_batch(["hola"], ["es"]) == ["hola"]
+    assert translation_stage.stats()["translate_errors"] == 1
+    assert len(translation_stage.cache) == 0
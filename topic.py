@@ -1,68 +1,169 @@
-import spacy
+import hashlib
 import json
+import os
+import numpy as np
+import instrumentation
+import models
+import result_cache
+from results import TopicResult
+
+# Set to a JSON file (e.g. written by topic_discovery.py) to replace the built-in hierarchy
+TOPIC_HIERARCHY_ENV = "CUSTOMERVOICE_TOPIC_HIERARCHY"
+
+DEFAULT_TOPIC_HIERARCHY = {
+    "Delivery": ["Fast Delivery", "Quick Delivery", "Late Delivery", "Free Delivery", "Damaged Package"],
+    "Quality": ["Material Quality", "Product Durability", "Build Quality", "Authenticity", "Defective Product"],
+    "Clothes": ["Size", "Fit", "Color", "Design", "Fabric Quality", "Comfort"],
+    "Customer Service": ["Helpful Support", "Rude Staff", "Slow Response", "Issue Resolution", "Refund Process"],
+    "Pricing": ["Expensive", "Affordable", "Discounts", "Overpriced", "Value for Money"],
+    "Usability": ["Easy to Use", "Complicated", "Intuitive Design", "Feature-Rich"],
+    "Experience": ["Satisfaction", "Disappointment", "Exceeded Expectations", "Frustration"],
+    "Packaging": ["Secure Packaging", "Damaged Packaging", "Eco-Friendly Packaging"],
+    "Returns": ["Easy Returns", "Difficult Returns", "Refund Process", "Exchange Policy"]
+}
+
+
+def load_hierarchy(path):
+    """Reads a {"Main Topic": ["Subtopic", ...]} JSON file."""
+    with open(path, encoding="utf-8") as f:
+        hierarchy = json.load(f)
+    if not isinstance(hierarchy, dict) or not all(
+        isinstance(subtopics, list) and all(isinstance(subtopic, str) for subtopic in subtopics)
+        for subtopics in hierarchy.values()
+    ):
+        raise ValueError(f"{path}: expected a JSON object mapping main topics to lists of subtopics")
+    return hierarchy
+
+
+def default_hierarchy():
+    """Hierarchy from CUSTOMERVOICE_TOPIC_HIERARCHY when set, else the built-in one."""
+    path = os.environ.get(TOPIC_HIERARCHY_ENV)
+    return load_hierarchy(path) if path else DEFAULT_TOPIC_HIERARCHY
+
+
+class TopicIndex:
+    """Embeds the topic hierarchy once into normalized vector matrices."""
+
+    def __init__(self, nlp, topic_hierarchy):
+        self.nlp = nlp
+        self.main_topics = list(topic_hierarchy)
+        self.main_orths, self.main_matrix = self.embed([topic.lower() for topic in self.main_topics])
+
+        # One matrix per main topic so subtopic scoring stays a single matmul
+        self.subtopics = {}
+        for main_topic, subtopic_list in topic_hierarchy.items():
+            orths, matrix = self.embed([subtopic.lower() for subtopic in subtopic_list])
+            self.subtopics[main_topic] = (list(subtopic_list), orths, matrix)
+
+    def embed(self, texts):
+        """Returns token texts and unit-norm vectors (zero rows where a text has no vector).
+
+        Only the tokenizer runs: Doc.vector is the mean of static word vectors, which
+        no pipeline component changes, so tagging/parsing these phrases would be wasted work.
+        """
+        docs = [self.nlp.make_doc(text) for text in texts]
+        orths = [tuple(token.text for token in doc) for doc in docs]
+        matrix = np.zeros((len(docs), self.nlp.vocab.vectors_length), dtype=np.float32)
+        for i, doc in enumerate(docs):
+            norm = doc.vector_norm
+            if norm:
+                matrix[i] = doc.vector / norm
+        return orths, matrix
+
+    @staticmethod
+    def similarity(keyword_orths, keyword_matrix, target_orths, target_matrix):
+        """Cosine similarity matrix (keywords x targets) following spaCy's Doc.similarity rules."""
+        scores = keyword_matrix @ target_matrix.T
+        # Doc.similarity short-circuits identical token sequences to 1.0
+        for i, keyword in enumerate(keyword_orths):
+            for j, target in enumerate(target_orths):
+                if keyword == target:
+                    scores[i, j] = 1.0
+        return scores
+
+    def best_scores(self, keyword_orths, keyword_matrix, target_orths, target_matrix):
+        """Best similarity per target across all keywords (0 when there are no keywords)."""
+        if not keyword_orths:
+            return np.zeros(len(target_orths), dtype=np.float32)
+        scores = self.similarity(keyword_orths, keyword_matrix, target_orths, target_matrix)
+        return scores.max(axis=0)
+
 
 class TopicAnalyzer:
-    def __init__(self):
+    def __init__(self, spacy_model=models.TOPIC_SPACY_MODEL, cache=None, exclude=models.TOPIC_PIPELINE_EXCLUDE,
+                 topic_hierarchy=None):
         """Initialize SpaCy model and define topic hierarchy."""
-        self.nlp = spacy.load("en_core_web_md")  
-
-        # Topic Hierarchy
-        self.topic_hierarchy = {
-            "Delivery": ["Fast Delivery", "Quick Delivery", "Late Delivery", "Free Delivery", "Damaged Package"],
-            "Quality": ["Material Quality", "Product Durability", "Build Quality", "Authenticity", "Defective Product"],
-            "Clothes": ["Size", "Fit", "Color", "Design", "Fabric Quality", "Comfort"],
-            "Customer Service": ["Helpful Support", "Rude Staff", "Slow Response", "Issue Resolution", "Refund Process"],
-            "Pricing": ["Expensive", "Affordable", "Discounts", "Overpriced", "Value for Money"],
-            "Usability": ["Easy to Use", "Complicated", "Intuitive Design", "Feature-Rich"],
-            "Experience": ["Satisfaction", "Disappointment", "Exceeded Expectations", "Frustration"],
-            "Packaging": ["Secure Packaging", "Damaged Packaging", "Eco-Friendly Packaging"],
-            "Returns": ["Easy Returns", "Difficult Returns", "Refund Process", "Exchange Policy"]
-        }
+        self.spacy_model = spacy_model
+        # Parser, NER & lemmatizer aren't needed for NOUN/ADJ tags and vectors
+        self.nlp = models.get_spacy_model(spacy_model, exclude=exclude)
 
+        # Result cache (shared per process by default, cache=False disables it)
+        self.cache = result_cache.resolve_cache(cache, "topic", TopicResult)
+
+        # Topic Hierarchy (a dict, or a JSON path from load_hierarchy's format)
+        if isinstance(topic_hierarchy, str):
+            topic_hierarchy = load_hierarchy(topic_hierarchy)
+        self.topic_hierarchy = dict(topic_hierarchy or default_hierarchy())
 
         # Similarity Thresholds
         self.topic_threshold = 0.8  
         self.subtopic_threshold = 0.5  # ✅ Exclude subtopics if below this
 
+        # Embed every main topic & subtopic once instead of per feedback
+        self.topic_index = TopicIndex(self.nlp, self.topic_hierarchy)
+        self.hierarchy_version = hashlib.sha256(
+            json.dumps(self.topic_hierarchy, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:16]
+
+    @property
+    def cache_version(self):
+        """Changes whenever the model, hierarchy or thresholds change."""
+        return f"topic:{self.spacy_model}:{self.hierarchy_version}:{self.topic_threshold}:{self.subtopic_threshold}"
+
     def extract_keywords(self, text):
         """Extracts relevant keywords (nouns, adjectives) from feedback."""
-        doc = self.nlp(text.lower())
+        with instrumentation.stage("topic.parse"):
+            doc = self.nlp(text.lower())
+        return self.keywords_from_doc(doc)
+
+    def keywords_from_doc(self, doc):
+        """Collects nouns & adjectives from an already parsed doc."""
         keywords = {token.text for token in doc if token.pos_ in {"NOUN", "ADJ"}}
         return keywords  
 
+    @instrumentation.timed("topic.match")
     def match_main_topic(self, keywords):
         """Matches keywords to main topics and selects only the most relevant subtopic."""
         main_topics = []
         subtopics = {}
 
-        for main_topic, subtopic_list in self.topic_hierarchy.items():
-            main_topic_doc = self.nlp(main_topic.lower())
-
-            # Compute similarity between extracted keywords and main topic
-            topic_similarity = max((self.nlp(keyword).similarity(main_topic_doc) for keyword in keywords), default=0)
+        # Embed all keywords in one pass, sorted so results don't depend on set order
+        keyword_orths, keyword_matrix = self.topic_index.embed(sorted(keywords))
 
-            #print(f"Main Topic: {main_topic}, Similarity: {topic_similarity:.4f}")  # Debugging
+        # Compute similarity between extracted keywords and every main topic at once
+        topic_similarities = self.topic_index.best_scores(
+            keyword_orths, keyword_matrix, self.topic_index.main_orths, self.topic_index.main_matrix
+        )
 
+        for main_topic, topic_similarity in zip(self.topic_index.main_topics, topic_similarities):
             if topic_similarity >= self.topic_threshold or main_topic.lower() in keywords:
                 main_topics.append(main_topic)
 
-                best_subtopic = None
-                best_similarity = 0
-                for subtopic in subtopic_list:
-                    subtopic_doc = self.nlp(subtopic.lower())
+                # Compute similarity between extracted keywords and each subtopic
+                subtopic_list, subtopic_orths, subtopic_matrix = self.topic_index.subtopics[main_topic]
+                subtopic_similarities = self.topic_index.best_scores(
+                    keyword_orths, keyword_matrix, subtopic_orths, subtopic_matrix
+                )
+                if not len(subtopic_similarities):
+                    continue
 
-                    # Compute similarity between extracted keywords and subtopic
-                    subtopic_similarity = max((self.nlp(keyword).similarity(subtopic_doc) for keyword in keywords), default=0)
-
-                    #print(f"  Subtopic: {subtopic}, Similarity: {subtopic_similarity:.4f}")  # Debugging
-
-                    if subtopic_similarity > best_similarity:
-                        best_subtopic = subtopic
-                        best_similarity = subtopic_similarity
+                # argmax keeps the first subtopic on ties, like the strict ">" it replaces
+                best_index = int(np.argmax(subtopic_similarities))
+                best_similarity = subtopic_similarities[best_index]
 
                 # ✅ Exclude subtopics if best match is below the threshold
-                if best_subtopic and best_similarity >= self.subtopic_threshold:
-                    subtopics[main_topic] = [best_subtopic]
+                if best_similarity > 0 and best_similarity >= self.subtopic_threshold:
+                    subtopics[main_topic] = [subtopic_list[best_index]]
 
         return {
             "main": main_topics,
@@ -71,16 +172,41 @@ class TopicAnalyzer:
 
     def analyze_feedback(self, feedback_text):
         """Extracts topics & subtopics from feedback."""
+        if self.cache is not None:
+            # Topics only see lowercased text, so case variants share an entry
+            key = result_cache.make_key(feedback_text.lower(), self.cache_version)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return TopicResult(feedback_text, cached.main, cached.subtopics)
+
         keywords = self.extract_keywords(feedback_text)
         #print(f"Extracted Keywords: {keywords}")  # Debugging
         matched_topics = self.match_main_topic(keywords)
-
-        final_output = {
-            "feedback": feedback_text,
-            "topics": matched_topics
-        }
-
-        return json.dumps(final_output, indent=4)
+        result = TopicResult(feedback_text, matched_topics["main"], matched_topics["subtopics"])
+
+        if self.cache is not None:
+            self.cache.put(key, result)
+        return result
+
+    def analyze_batch(self, texts, batch_size=64):
+        """Extracts topics for many texts, parsing them with nlp.pipe; results keep input order."""
+        texts = list(texts)
+        cached = result_cache.cached_batch(
+            self.cache, [text.lower() for text in texts], self.cache_version,
+            lambda misses: self._analyze_uncached_batch(misses, batch_size)
+        )
+        # Cached entries may come from a differently formatted duplicate; keep this text
+        return [TopicResult(text, result.main, result.subtopics) for text, result in zip(texts, cached)]
+
+    def _analyze_uncached_batch(self, texts, batch_size):
+        with instrumentation.stage("topic.parse", items=len(texts)):
+            docs = list(self.nlp.pipe((text.lower() for text in texts), batch_size=batch_size))
+
+        results = []
+        for feedback_text, doc in zip(texts, docs):
+            matched_topics = self.match_main_topic(self.keywords_from_doc(doc))
+            results.append(TopicResult(feedback_text, matched_topics["main"], matched_topics["subtopics"]))
+        return results
 
 # ==== Example Usage ====
 if __name__ == "__main__":
@@ -88,4 +214,4 @@ if __name__ == "__main__":
     
     feedback_text = "The delivery was incredibly fast and the quality was amazing! However, one of the clothing items didn't fit well."
     result = analyzer.analyze_feedback(feedback_text)
-    print(result)
+    print(result.to_json(indent=4))
@@ -0,0 +1,189 @@
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+
+import numpy as np
+
+import models
+import result_cache
+from cli import chunked, read_rows
+from topic import DEFAULT_TOPIC_HIERARCHY, load_hierarchy
+
+
+def _embedding_cache():
+    """Shared cache of float32 embeddings (persistent when CUSTOMERVOICE_CACHE_PATH is set)."""
+    return result_cache.get_cache(
+        "embedding",
+        serialize=lambda vector: np.asarray(vector, dtype=np.float32).tobytes(),
+        deserialize=lambda data: np.frombuffer(data, dtype=np.float32)
+    )
+
+
+class TopicDiscovery:
+    """Offline BERTopic clustering of a feedback corpus, fed in batches with partial_fit.
+
+    Every component is an online one (IncrementalPCA, MiniBatchKMeans, OnlineCountVectorizer),
+    so a saved model keeps learning from new batches instead of reclustering from scratch.
+    """
+
+    def __init__(self, n_clusters=30, embedding_model=models.SENTENCE_ENCODER_NAME, cache=None,
+                 model_path=None, n_components=5, random_state=0):
+        self.n_clusters = n_clusters
+        self.embedding_model = embedding_model
+        self.encoder = models.get_sentence_encoder(embedding_model)
+        # cache=False embeds every text; None uses the shared "embedding" cache
+        self.cache = None if cache is False else (_embedding_cache() if cache is None else cache)
+        self.topic_sizes = Counter()
+        self.documents = 0
+
+        if model_path and os.path.exists(model_path):
+            from bertopic import BERTopic
+            self.topic_model = BERTopic.load(model_path, embedding_model=self.encoder)
+            self._load_sizes(model_path)
+        else:
+            self.topic_model = self._new_model(n_components, random_state)
+
+    def _new_model(self, n_components, random_state):
+        try:
+            from bertopic import BERTopic
+            from bertopic.vectorizers import OnlineCountVectorizer
+            from sklearn.cluster import MiniBatchKMeans
+            from sklearn.decomposition import IncrementalPCA
+        except ImportError as e:
+            raise ImportError("Topic discovery requires `pip install bertopic`") from e
+
+        return BERTopic(
+            embedding_model=self.encoder,
+            umap_model=IncrementalPCA(n_components=n_components),
+            hdbscan_model=MiniBatchKMeans(n_clusters=self.n_clusters, random_state=random_state, n_init=3),
+            # decay down-weights old counts so topic words follow recent feedback
+            vectorizer_model=OnlineCountVectorizer(stop_words="english", ngram_range=(1, 2), decay=0.01),
+        )
+
+    def embed(self, texts, batch_size=64):
+        """Float32 embedding matrix for texts; only texts missing from the cache are encoded."""
+        vectors = result_cache.cached_batch(
+            self.cache, texts, f"embedding:{self.embedding_model}",
+            lambda misses: list(self.encoder.encode(misses, batch_size=batch_size, convert_to_numpy=True))
+        )
+        return np.vstack(vectors).astype(np.float32, copy=False)
+
+    def partial_fit(self, texts):
+        """Updates the clusters and topic words with one batch (at least n_clusters texts)."""
+        if len(texts) < self.n_clusters:
+            raise ValueError(f"partial_fit needs at least n_clusters={self.n_clusters} texts, got {len(texts)}")
+        self.topic_model.partial_fit(texts, embeddings=self.embed(texts))
+        # topics_ only holds the latest batch's assignments, so sizes are accumulated here
+        self.topic_sizes.update(self.topic_model.topics_)
+        self.documents += len(texts)
+
+    def fit_corpus(self, texts, batch_size=2000):
+        """Feeds an iterable of texts in batches; a short final batch is merged into the previous one."""
+        pending = None
+        for batch in chunked(texts, batch_size):
+            if pending is not None and len(batch) < self.n_clusters:
+                pending.extend(batch)
+                continue
+            if pending is not None:
+                self.partial_fit(pending)
+            pending = batch
+        if pending:
+            self.partial_fit(pending)
+        return self.documents
+
+    def topics(self, top_n_words=10):
+        """Discovered clusters as (size, [topic words]) pairs, largest first."""
+        discovered = []
+        for topic_id, size in self.topic_sizes.most_common():
+            words = self.topic_model.get_topic(topic_id) or []
+            if topic_id != -1 and words:
+                discovered.append((size, [word for word, _ in words[:top_n_words]]))
+        return discovered
+
+    def propose_hierarchy(self, existing=None, max_subtopics=5, min_topic_size=20):
+        """Merges discovered clusters into a topic_hierarchy dict that TopicAnalyzer can load.
+
+        A cluster's top word names the main topic and its next words become subtopics. Clusters
+        whose name matches an existing main topic only add subtopics; smaller clusters are dropped.
+        """
+        hierarchy = {main: list(subtopics) for main, subtopics in (existing or {}).items()}
+        by_name = {main.lower(): main for main in hierarchy}
+
+        for size, words in self.topics():
+            if size < min_topic_size:
+                continue
+            name = words[0].title()
+            main = by_name.setdefault(name.lower(), name)
+            subtopics = hierarchy.setdefault(main, [])
+
+            known = {subtopic.lower() for subtopic in subtopics}
+            added = 0
+            for word in words[1:]:
+                if added >= max_subtopics:
+                    break
+                if word.lower() in known or word.lower() == main.lower():
+                    continue
+                subtopics.append(word.title())
+                known.add(word.lower())
+                added += 1
+
+        return hierarchy
+
+    def save(self, model_path):
+        """Pickles the online model (without the encoder) and the accumulated topic sizes."""
+        self.topic_model.save(model_path, serialization="pickle", save_embedding_model=False)
+        with open(f"{model_path}.sizes.json", "w", encoding="utf-8") as f:
+            json.dump({"documents": self.documents, "sizes": {str(k): v for k, v in self.topic_sizes.items()}}, f)
+
+    def _load_sizes(self, model_path):
+        path = f"{model_path}.sizes.json"
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                saved = json.load(f)
+            self.documents = saved["documents"]
+            self.topic_sizes = Counter({int(k): v for k, v in saved["sizes"].items()})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Discover topics in a feedback corpus and emit a topic hierarchy.")
+    parser.add_argument("input", help="CSV or JSONL file with one feedback per row")
+    parser.add_argument("-o", "--output", required=True, help="Hierarchy JSON for CUSTOMERVOICE_TOPIC_HIERARCHY")
+    parser.add_argument("--text-column", default="feedback")
+    parser.add_argument("--input-format", choices=["csv", "jsonl"], default=None)
+    parser.add_argument("--model-path", default=None,
+                        help="Saved discovery model; updated in place so later runs continue from it")
+    parser.add_argument("--n-clusters", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=2000, help="Texts per partial_fit batch")
+    parser.add_argument("--embedding-model", default=models.SENTENCE_ENCODER_NAME)
+    parser.add_argument("--base", default=None,
+                        help="Hierarchy JSON to extend (default: the built-in one); 'none' starts empty")
+    parser.add_argument("--max-subtopics", type=int, default=5)
+    parser.add_argument("--min-topic-size", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    discovery = TopicDiscovery(args.n_clusters, args.embedding_model, model_path=args.model_path)
+    texts = (
+        row[args.text_column] for _, row in read_rows(args.input, args.input_format)
+        if (row.get(args.text_column) or "").strip()
+    )
+    discovery.fit_corpus(texts, args.batch_size)
+    if args.model_path:
+        discovery.save(args.model_path)
+
+    if args.base == "none":
+        base = {}
+    else:
+        base = load_hierarchy(args.base) if args.base else DEFAULT_TOPIC_HIERARCHY
+    hierarchy = discovery.propose_hierarchy(base, args.max_subtopics, args.min_topic_size)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(hierarchy, f, indent=4)
+
+    new_topics = [main for main in hierarchy if main not in base]
+    print(json.dumps({"documents": discovery.documents, "clusters": len(discovery.topics()),
+                      "new_main_topics": new_topics}, indent=4), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
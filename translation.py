@@ -0,0 +1,223 @@
+import logging
+from abc import ABC, abstractmethod
+import queue
+import threading
+import time
+
+import instrumentation
+import result_cache
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------- Backends ----------------------
+class TranslationBackend(ABC):
+    """Translates a list of texts from one source language in a single call."""
+    name = "base"
+
+    @abstractmethod
+    def translate_batch(self, texts, src, dest):
+        """Translations of texts from src ("auto" lets the backend detect it) to dest, in order."""
+
+
+class GoogleTranslateBackend(TranslationBackend):
+    """googletrans behind a small pool of reused clients instead of a new Translator per call."""
+    name = "googletrans"
+
+    def __init__(self, pool_size=4):
+        self._pool = queue.LifoQueue()
+        self._created = 0
+        self._pool_size = pool_size
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self._pool_size:
+                from googletrans import Translator
+                self._created += 1
+                return Translator()
+        return self._pool.get()  # Pool exhausted: wait for a client to come back
+
+    def translate_batch(self, texts, src, dest):
+        client = self._acquire()
+        try:
+            # googletrans accepts a list and reuses the client's HTTP session for every item
+            translated = client.translate(list(texts), src=src, dest=dest)
+        finally:
+            self._pool.put(client)
+        return [item.text for item in translated]
+
+
+class StubBackend(TranslationBackend):
+    """Offline backend for tests: returns known translations, otherwise the text itself."""
+    name = "stub"
+
+    def __init__(self, translations=None):
+        self.translations = translations or {}
+        self.calls = []
+
+    def translate_batch(self, texts, src, dest):
+        self.calls.append((src, dest, list(texts)))
+        return [self.translations.get(text, text) for text in texts]
+
+
+BACKENDS = {
+    GoogleTranslateBackend.name: GoogleTranslateBackend,
+    StubBackend.name: StubBackend,
+}
+
+
+# ---------------------- Stage ----------------------
+class TranslationStage:
+    """Bulk language detection plus cached, per-language batched translation."""
+
+    def __init__(self, backend=None, cache=None, target_lang="en", batch_size=32, min_source_confidence=0.9):
+        self.backend = backend or GoogleTranslateBackend()
+        # Below this langdetect probability the backend auto-detects the source language itself;
+        # langdetect is often wrong on short answers and a forced wrong `src` mistranslates
+        self.min_source_confidence = min_source_confidence
+        self.cache = result_cache.get_cache("translation") if cache is None else (None if cache is False else cache)
+        self.target_lang = target_lang
+        self.batch_size = batch_size
+        self.counters = {
+            "detected": 0, "detect_errors": 0, "detect_seconds": 0.0,
+            "translated": 0, "translate_calls": 0, "translate_errors": 0, "translate_seconds": 0.0,
+        }
+        self._lock = threading.Lock()
+
+    def _count(self, **increments):
+        with self._lock:
+            for name, value in increments.items():
+                self.counters[name] += value
+
+    def detect_languages(self, texts):
+        """Language code per text ("unknown" when undetectable); duplicates are detected once."""
+        return [language for language, _ in self.detect_languages_with_confidence(texts)]
+
+    def detect_languages_with_confidence(self, texts):
+        """(language code, langdetect probability) per text; ("unknown", 0.0) when undetectable."""
+        from langdetect import DetectorFactory, LangDetectException, detect_langs
+        DetectorFactory.seed = 0  # langdetect is random by default; keep results stable
+
+        start = time.perf_counter()
+        detected, errors = {}, 0
+        with instrumentation.stage("translation.detect", items=len(texts)):
+            for text in texts:
+                if text in detected:
+                    continue
+                try:
+                    best = detect_langs(text)[0]
+                    detected[text] = (best.lang, best.prob)
+                except LangDetectException:
+                    detected[text] = ("unknown", 0.0)
+                    errors += 1
+        self._count(detected=len(detected), detect_errors=errors, detect_seconds=time.perf_counter() - start)
+        return [detected[text] for text in texts]
+
+    def translate_batch(self, texts, languages=None, confidences=None):
+        """Translates texts to the target language, grouping calls by source language.
+
+        Detected languages below min_source_confidence are sent as src="auto"; languages
+        passed without confidences are trusted as given.
+        """
+        texts = list(texts)
+        if languages is None:
+            detected = self.detect_languages_with_confidence(texts)
+            languages = [language for language, _ in detected]
+            confidences = [confidence for _, confidence in detected]
+        if confidences is None:
+            confidences = [1.0] * len(texts)
+        translated = list(texts)
+
+        # Group by source language so each backend call has a single `src`
+        groups = {}
+        for i, (language, confidence) in enumerate(zip(languages, confidences)):
+            if language == self.target_lang:
+                continue
+            confident = language != "unknown" and confidence >= self.min_source_confidence
+            groups.setdefault(language if confident else "auto", []).append(i)
+
+        for src, indices in groups.items():
+            version = f"{self.backend.name}:{src}:{self.target_lang}"
+            pending = {}
+            for i in indices:
+                key = result_cache.make_key(texts[i], version)
+                cached = self.cache.get(key) if self.cache is not None else None
+                if cached is not None:
+                    translated[i] = cached
+                else:
+                    pending.setdefault(key, []).append(i)
+
+            keys = list(pending)
+            for start in range(0, len(keys), self.batch_size):
+                batch_keys = keys[start:start + self.batch_size]
+                batch_texts = [texts[pending[key][0]] for key in batch_keys]
+                done = []
+                for key, text in zip(batch_keys, self._translate(batch_texts, src)):
+                    if text is None:
+                        continue  # Failed: keep the original text and don't cache, so it's retried later
+                    done.append((key, text))
+                    for i in pending[key]:
+                        translated[i] = text
+                if self.cache is not None:
+                    self.cache.put_many(done)
+
+        return translated
+
+    def _translate(self, texts, src):
+        start = time.perf_counter()
+        try:
+            with instrumentation.stage("translation.translate", items=len(texts)):
+                results = self.backend.translate_batch(texts, src=src, dest=self.target_lang)
+        except Exception as e:
+            # Network/backends fail in many ways; record it and fall back to the original text
+            logger.warning("Translation of %d text(s) from %s failed: %r", len(texts), src, e)
+            self._count(translate_calls=1, translate_errors=len(texts), translate_seconds=time.perf_counter() - start)
+            return [None] * len(texts)
+
+        self._count(translate_calls=1, translated=len(texts), translate_seconds=time.perf_counter() - start)
+        return results
+
+    def process(self, texts):
+        """Returns (languages, texts in the target language) for a batch."""
+        texts = list(texts)
+        detected = self.detect_languages_with_confidence(texts)
+        languages = [language for language, _ in detected]
+        return languages, self.translate_batch(texts, languages, [confidence for _, confidence in detected])
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+        stats["detect_seconds"] = round(stats["detect_seconds"], 4)
+        stats["translate_seconds"] = round(stats["translate_seconds"], 4)
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        return stats
+
+
+# Shared default stage for one-off calls (e.g. the Streamlit app)
+_default_stage = None
+_default_lock = threading.Lock()
+
+
+def get_stage():
+    global _default_stage
+    with _default_lock:
+        if _default_stage is None:
+            _default_stage = TranslationStage()
+        return _default_stage
+
+
+def detect_language(text):
+    return get_stage().detect_languages([text])[0]
+
+
+def translate_text(text, target_lang="en"):
+    stage = get_stage()
+    if target_lang != stage.target_lang:
+        stage = TranslationStage(backend=stage.backend, target_lang=target_lang)
+    return stage.translate_batch([text], ["unknown"])[0]